@@ -0,0 +1,93 @@
+# analytics.py
+"""투어 통계: 가능성 가중 예상 관객, 주별 이동 거리/시간, 실내/실외 비율, 누적 경로 거리.
+
+입력은 models.schedule(버전별 일정)과 segments.table(증분 갱신되는 구간 표)이고,
+결과는 (일정 버전, 이동 시간 모델)마다 한 번만 계산해 모든 세션이 공유합니다.
+pandas는 통계를 처음 계산할 때 불러옵니다.
+"""
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import models
+import segments
+
+MAX_CACHED_STATS = 8
+_stats_cache = OrderedDict()
+_stats_lock = threading.Lock()
+
+
+class TourStats:
+    def __init__(self, version, stops, weekly, by_type, route):
+        self.version = version
+        self.stops = stops  # 정류지별 표 (date, city, type, seats, probability, expected)
+        self.weekly = weekly  # 주(월요일 시작)별 stops/seats/expected/km/hours
+        self.by_type = by_type  # indoor/outdoor별 stops/seats/expected
+        self.route = route  # 경로 순서별 date/city/leg_km/leg_hours/cum_km
+        self.total_seats = int(stops["seats"].sum()) if len(stops) else 0
+        self.expected_attendance = float(stops["expected"].sum()) if len(stops) else 0.0
+        self.total_km = float(route["leg_km"].sum()) if len(route) else 0.0
+        self.total_hours = float(route["leg_hours"].sum()) if len(route) else 0.0
+
+
+def _week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def _compute(version, segment_table):
+    import pandas as pd
+
+    entries = [e for e in models.schedule(version) if e.date is not None]
+    stops = pd.DataFrame(
+        [(e.date, e.city, e.type, e.seats or 0, e.probability) for e in entries],
+        columns=["date", "city", "type", "seats", "probability"],
+    )
+    stops["expected"] = stops["seats"] * stops["probability"] / 100.0
+    stops["week"] = [_week_start(d) for d in stops["date"]]
+
+    # 경로 순서 표. 구간(앞 정류지 -> 이 정류지)은 도착 정류지 행에 둡니다.
+    route = pd.DataFrame(
+        [
+            (
+                stop.day, stop.city,
+                segment_table.leg_km[i - 1] if i else 0.0,
+                segment_table.leg_hours[i - 1] if i else 0.0,
+                segment_table.cum_km[i - 1] if i else 0.0,
+            )
+            for i, stop in enumerate(segment_table.stops)
+        ],
+        columns=["date", "city", "leg_km", "leg_hours", "cum_km"],
+    )
+    legs = route.iloc[1:].dropna(subset=["date"]).copy()
+    legs["week"] = [_week_start(d) for d in legs["date"]]
+
+    weekly = stops.groupby("week").agg(
+        stops=("city", "size"), seats=("seats", "sum"), expected=("expected", "sum")
+    ).join(
+        legs.groupby("week").agg(km=("leg_km", "sum"), hours=("leg_hours", "sum")), how="outer"
+    ).fillna(0).sort_index()
+
+    by_type = stops.groupby("type").agg(
+        stops=("city", "size"), seats=("seats", "sum"), expected=("expected", "sum")
+    ).reindex(["indoor", "outdoor"], fill_value=0)
+
+    return TourStats(version, stops.drop(columns=["week"]), weekly, by_type, route)
+
+
+def tour_stats(version, travel_model):
+    """일정 버전의 통계. 같은 버전/모델이면 다시 계산하지 않습니다."""
+    key = (version, travel_model.cache_key)
+    with _stats_lock:
+        hit = _stats_cache.get(key)
+        if hit is not None:
+            _stats_cache.move_to_end(key)
+            return hit
+
+    result = _compute(version, segments.table(travel_model))
+
+    with _stats_lock:
+        _stats_cache[key] = result
+        _stats_cache.move_to_end(key)
+        while len(_stats_cache) > MAX_CACHED_STATS:
+            _stats_cache.popitem(last=False)
+    return result
@@ -1,22 +1,32 @@
 import streamlit as st
-import pandas as pd
 import uuid
-import json
 import os
-import base64
-import random
-from datetime import datetime, date, timedelta
-import folium
-from streamlit_folium import st_folium
-from folium.plugins import AntPath
+import html
+from datetime import datetime, date
+import streamlit.components.v1 as components
 from pytz import timezone
-from math import radians, cos, sin, asin, sqrt
-
-# --- 파일 저장 경로 설정 ---
-# IMPORTANT: Streamlit runs from the root of the project, so UPLOAD_DIR is created there.
-UPLOAD_DIR = "uploads"
+import sqlite3
+import constants
+import i18n
+import storage
+import live
+import tour_map
+import media
+import models
+import geo
+import route
+import segments
+import analytics
+import travel
+import bus
+
+# --- 파일 저장 경로 설정 (media.py) ---
+UPLOAD_DIR = media.UPLOAD_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# --- 워커 간 무효화 버스 (bus.py): 다른 워커의 저장을 받아 공유 인덱스를 미리 갱신 ---
+bus.start()
+
 # 가짜 라이브러리 임포트 (st_autorefresh는 Streamlit 환경에서만 유효)
 try:
     from streamlit_autorefresh import st_autorefresh
@@ -30,208 +40,16 @@ NOTICE_FILE = "notice.json"
 CITY_FILE = "cities.json"
 USER_POST_FILE = "user_posts.json"
 
-# --- 다국어 설정 ---
-LANG = {
-    "ko": {
-        "title_cantata": "칸타타 투어", "title_year": "2025", "title_region": "마하라스트라",
-        "tab_notice": "공지", "tab_map": "투어 경로", "indoor": "실내", "outdoor": "실외",
-        "venue": "공연 장소", "seats": "예상 인원", "note": "특이사항", "google_link": "구글맵",
-        "warning": "도시와 장소를 입력하세요", "delete": "제거", "menu": "메뉴", "login": "로그인", "logout": "로그아웃",
-        "add_city": "추가", "register": "등록", "update": "수정", "remove": "제거",
-        "date": "날짜", "city_name": "도시 이름", "search_placeholder": "도시/장소 검색...",
-        
-        # 추가 번역 (모든 UI 요소 포함)
-        "general": "일반", "urgent": "긴급",
-        "admin_login": "관리자 로그인",
-        "update_content": "내용 수정",
-        "existing_notices": "기존 공지사항",
-        "no_notices": "공지사항이 없습니다.",
-        "content": "내용",
-        "no_content": "내용 없음",
-        "no_title": "제목 없음",
-        "tour_schedule_management": "투어 일정 관리",
-        "set_data": "데이터 설정",
-        "type": "유형",
-        "city": "도시",
-        "link": "링크",
-        "past_route": "지난 경로",
-        "single_location": "단일 위치",
-        "legend": "범례",
-        "no_schedule": "일정이 없습니다.",
-        "city_coords_error": "좌표를 찾을 수 없습니다. city_dict에 추가해 주세요.",
-        "logged_in_success": "관리자로 로그인했습니다.",
-        "logged_out_success": "로그아웃했습니다.",
-        "incorrect_password": "비밀번호가 틀렸습니다.",
-        "fill_in_fields": "제목과 내용을 채워주세요.",
-        "notice_reg_success": "공지사항이 성공적으로 등록되었습니다!",
-        "notice_del_success": "공지사항이 삭제되었습니다.",
-        "notice_upd_success": "공지사항이 수정되었습니다.",
-        "schedule_reg_success": "일정이 등록되었습니다.",
-        "schedule_del_success": "일정 항목이 제거되었습니다.",
-        "schedule_upd_success": "일정이 성공적으로 수정되었습니다.",
-        "venue_placeholder": "공연 장소를 입력하세요",
-        "note_placeholder": "특이사항을 입력하세요",
-        "google_link_placeholder": "구글맵 URL을 입력하세요",
-        "seats_tooltip": "예상 관객 인원",
-        "file_attachment": "파일 첨부",
-        "attached_files": "첨부 파일",
-        "no_files": "없음",
-        "user_posts": "사용자 포스트",
-        "new_post": "새 포스트 작성",
-        "post_content": "포스트 내용",
-        "media_attachment": "사진/동영상 첨부",
-        "post_success": "포스트가 성공적으로 업로드되었습니다!",
-        "no_posts": "현재 포스트가 없습니다.",
-        "admin_only_files": "첨부 파일은 관리자만 확인 가능합니다.",
-        "probability": "가능성 (%)",
-        "delete_data_title": "🚨 전체 데이터 초기화 (모두)",
-        "delete_data_confirm": "✅ 최종 확인: 모든 데이터 삭제",
-        
-        # [NEW] 일정 삭제 관련 번역
-        "delete_all_schedule": "일정 전체 삭제",
-        "confirm_schedule_delete_q": "⚠️ 정말로 투어 일정을 모두 삭제하시겠습니까? 이 작업은 되돌릴 수 없습니다.",
-        "confirm_yes": "예, 삭제합니다",
-        "confirm_no": "아니오, 취소합니다",
-        "schedule_cleared_success": "✅ 투어 일정이 모두 삭제되었습니다.",
-    },
-    "en": {
-        "title_cantata": "Cantata Tour", "title_year": "2025", "title_region": "Maharashtra",
-        "tab_notice": "Notice", "tab_map": "Tour Route", "indoor": "Indoor", "outdoor": "Outdoor",
-        "venue": "Venue", "seats": "Expected", "note": "Note", "google_link": "Google Maps",
-        "warning": "Enter city and venue", "delete": "Remove", "menu": "Menu", "login": "Login", "logout": "Logout",
-        "add_city": "Add", "register": "Register", "update": "Update", "remove": "Remove",
-        "date": "Date", "city_name": "City Name", "search_placeholder": "Search City/Venue...",
-        
-        # Additional translations
-        "general": "General", "urgent": "Urgent",
-        "admin_login": "Admin Login",
-        "update_content": "Update Content",
-        "existing_notices": "Existing Notices",
-        "no_notices": "No notices available.",
-        "content": "Content",
-        "no_content": "No Content",
-        "no_title": "No Title",
-        "tour_schedule_management": "Tour Schedule Management",
-        "set_data": "Set Data",
-        "type": "Type",
-        "city": "City",
-        "link": "Link",
-        "past_route": "Past Route",
-        "single_location": "Single Location",
-        "legend": "Legend",
-        "no_schedule": "No schedule available.",
-        "city_coords_error": "Coordinates not found. Please add to city_dict.",
-        "logged_in_success": "Logged in as Admin.",
-        "logged_out_success": "Logged out.",
-        "incorrect_password": "Incorrect password.",
-        "fill_in_fields": "Please fill in the title and content.",
-        "notice_reg_success": "Notice registered successfully!",
-        "notice_del_success": "Notice deleted.",
-        "notice_upd_success": "Notice updated.",
-        "schedule_reg_success": "Schedule registered.",
-        "schedule_del_success": "Schedule entry removed.",
-        "schedule_upd_success": "Schedule updated successfully.",
-        "venue_placeholder": "Enter venue name",
-        "note_placeholder": "Enter notes/special remarks",
-        "google_link_placeholder": "Enter Google Maps URL",
-        "seats_tooltip": "Expected audience count",
-        "file_attachment": "File Attachment",
-        "attached_files": "Attached Files",
-        "no_files": "None",
-        "user_posts": "User Posts",
-        "new_post": "Create New Post",
-        "post_content": "Post Content",
-        "media_attachment": "Attach Photo/Video",
-        "post_success": "Post uploaded successfully!",
-        "no_posts": "No posts available.",
-        "admin_only_files": "Attached files can only be viewed by Admin.",
-        "probability": "Probability (%)",
-        "delete_data_title": "🚨 Clear All Data (All)",
-        "delete_data_confirm": "✅ Final Confirmation: Delete All Data",
-        
-        # [NEW] 일정 삭제 관련 번역
-        "delete_all_schedule": "Clear All Schedule",
-        "confirm_schedule_delete_q": "⚠️ Are you sure you want to delete all tour schedules? This cannot be undone.",
-        "confirm_yes": "Yes, Delete All",
-        "confirm_no": "No, Cancel",
-        "schedule_cleared_success": "✅ Tour schedule cleared successfully.",
-    },
-    "hi": {
-        "title_cantata": "कैंटाटा टूर", "title_year": "२०२५", "title_region": "महाराष्ट्र",
-        "tab_notice": "सूचना", "tab_map": "टूर रूट", "indoor": "इनडोर", "outdoor": "आउटडोर",
-        "venue": "स्थल", "seats": "अपेक्षित", "note": "नोट", "google_link": "गूगल मैप्स",
-        "warning": "शहर और स्थल दर्ज करें", "delete": "हटाएं", "menu": "मेनू", "login": "लॉगिन", "logout": "लॉगआउट",
-        "add_city": "जोड़ें", "register": "रजिस्टर", "update": "अपडेट", "remove": "हटाएं",
-        "date": "तारीख", "city_name": "शहर का नाम", "search_placeholder": "शहर/स्थल खोजें...",
-        
-        # Additional translations
-        "general": "सामान्य", "urgent": "तत्काल",
-        "admin_login": "व्यवस्थापक लॉगिन",
-        "update_content": "सामग्री अपडेट करें",
-        "existing_notices": "मौजूदा सूचनाएं",
-        "no_notices": "कोई सूचना उपलब्ध नहीं है।",
-        "content": "सामग्री",
-        "no_content": "कोई सामग्री नहीं",
-        "no_title": "कोई शीर्षक नहीं",
-        "tour_schedule_management": "टूर अनुसूची प्रबंधन",
-        "set_data": "डेटा सेट करें",
-        "type": "प्रकार",
-        "city": "शहर",
-        "link": "लिंक",
-        "past_route": "पिछला मार्ग",
-        "single_location": "एकल स्थान",
-        "legend": "किंवदंती",
-        "no_schedule": "कोई कार्यक्रम उपलब्ध नहीं है।",
-        "city_coords_error": "निर्देशांक नहीं मिला। कृपया city_dict में जोड़ें।",
-        "logged_in_success": "व्यवस्थापक के रूप में लॉग इन किया गया।",
-        "logged_out_success": "लॉग आउट किया गया।",
-        "incorrect_password": "गलत पासवर्ड।",
-        "fill_in_fields": "कृपया शीर्षक और सामग्री भरें।",
-        "notice_reg_success": "सूचना सफलतापूर्वक पंजीकृत हुई!",
-        "notice_del_success": "सूचना हटा दी गई।",
-        "notice_upd_success": "सूचना अपडेट की गई।",
-        "schedule_reg_success": "कार्यक्रम पंजीकृत हुआ।",
-        "schedule_del_success": "कार्यक्रम प्रविष्टि हटा दी गई।",
-        "schedule_upd_success": "कार्यक्रम सफलतापूर्वक अपडेट किया गया।",
-        "venue_placeholder": "स्थल का नाम दर्ज करें",
-        "note_placeholder": "नोट्स/विशेष टिप्पणी दर्ज करें",
-        "google_link_placeholder": "गूगल मैप्स URL दर्ज करें",
-        "seats_tooltip": "अपेक्षित दर्शक संख्या",
-        "file_attachment": "फ़ाइल संलग्नक",
-        "attached_files": "संलग्न फ़ाइलें",
-        "no_files": "कोई नहीं",
-        "user_posts": "उपयोगकर्ता पोस्ट",
-        "new_post": "नई पोस्ट बनाएं",
-        "post_content": "पोस्ट सामग्री",
-        "media_attachment": "फोटो/वीडियो संलग्न करें",
-        "post_success": "पोस्ट सफलतापूर्वक अपलोड हुई!",
-        "no_posts": "कोई पोस्ट उपलब्ध नहीं है।",
-        "admin_only_files": "संलग्न फ़ाइलें केवल व्यवस्थापक द्वारा देखी जा सकती हैं।",
-        "probability": "संभावना (%)",
-        "delete_data_title": "🚨 सभी डेटा साफ़ करें (सभी)",
-        "delete_data_confirm": "✅ अंतिम पुष्टि: सभी डेटा हटाएं",
-        
-        # [NEW] 일정 삭제 관련 번역
-        "delete_all_schedule": "सभी शेड्यूल साफ़ करें",
-        "confirm_schedule_delete_q": "⚠️ क्या आप वाकई सभी टूर शेड्यूल हटाना चाहते हैं? यह पूर्ववत नहीं किया जा सकता है।",
-        "confirm_yes": "हाँ, सभी हटाएँ",
-        "confirm_no": "नहीं, रद्द करें",
-        "schedule_cleared_success": "✅ टूर शेड्यूल सफलतापूर्वक साफ़ किया गया।",
-    }
-}
-
 # --- 세션 초기화 ---
-defaults = {"admin": False, "lang": "ko", "notice_open": False, "map_open": False, "logged_in_user": None, "show_login_form": False, "show_final_delete_confirm": False, "confirm_schedule_delete": False}
+defaults = {"admin": False, "lang": "ko", "notice_open": False, "map_open": False, "logged_in_user": None, "show_login_form": False, "show_final_delete_confirm": False, "confirm_schedule_delete": False, "notice_pages": 1, "post_pages": 1}
 for k, v in defaults.items():
     if k not in st.session_state:
         st.session_state[k] = v
     elif k == "lang" and not isinstance(st.session_state[k], str):
         st.session_state[k] = "ko"
 
-# --- 번역 함수 ---
-def _(key):
-    lang = st.session_state.lang if isinstance(st.session_state.lang, str) else "ko"
-    return LANG.get(lang, LANG["ko"]).get(key, key)
+# --- 번역 함수 (i18n.py: 언어별 번역기를 프로세스에서 공유, _("key")는 딕셔너리 조회 한 번) ---
+_ = i18n.translator(st.session_state.lang)
 
 # --- Streamlit Rerun 헬퍼 함수 ---
 def safe_rerun():
@@ -243,39 +61,19 @@ def safe_rerun():
 
 # --- 파일 첨부/저장 함수 ---
 def save_uploaded_files(uploaded_files):
-    file_info_list = []
-    for uploaded_file in uploaded_files:
-        unique_filename = f"{uuid.uuid4()}_{uploaded_file.name}"
-        file_path = os.path.join(UPLOAD_DIR, unique_filename)
-        
-        try:
-            with open(file_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            
-            file_info_list.append({
-                "name": uploaded_file.name,
-                "path": file_path,
-                "type": uploaded_file.type,
-                "size": uploaded_file.size
-            })
-        except Exception:
-            # 파일 저장 오류 무시
-            pass
-            
-    return file_info_list
+    """업로드 파일을 조각 단위로 저장하고 (파일 정보 목록, 오류 메시지 목록)을 반환합니다."""
+    file_info_list, errors = media.save_uploads(uploaded_files)
+    # 사진은 축소본(thumb/mobile/full)과 블러 미리보기를 백그라운드에서 생성
+    return [media.schedule_variants(file_info) for file_info in file_info_list], errors
 
-# --- 파일 Base64 인코딩 함수 (추가) ---
-def get_file_as_base64(file_path):
-    """파일 경로를 받아 Base64 문자열을 반환합니다."""
-    try:
-        with open(file_path, "rb") as f:
-            file_bytes = f.read()
-            base64_encoded_data = base64.b64encode(file_bytes).decode('utf-8')
-            return base64_encoded_data
-    except Exception:
-        return None
+def show_upload_errors():
+    """직전 업로드에서 저장하지 못한 파일을 알려 줍니다 (재실행 후 한 번 표시)."""
+    for message in st.session_state.pop("upload_errors", []):
+        st.error(message)
 
 # --- 미디어 인라인 표시 및 다운로드 헬퍼 함수 ---
+# 허브가 있으면 파일 내용은 server.py의 /media 엔드포인트가 스트리밍하고, 페이지에는 URL만 넣습니다.
+# 허브가 없으면(기본) Streamlit으로 직접 표시합니다.
 def display_and_download_file(file_info, notice_id, is_admin=False, is_user_post=False):
     file_size_kb = round(file_info['size'] / 1024, 1)
     file_type = file_info['type']
@@ -288,37 +86,21 @@ def display_and_download_file(file_info, notice_id, is_admin=False, is_user_post
         st.markdown(f"**{_('attached_files')}:** {_('admin_only_files')}")
         return
 
-    if os.path.exists(file_path):
+    if not os.path.exists(file_path):
+        st.markdown(f"**{file_name}** (파일을 찾을 수 없습니다.)")
+    elif not media.served() or is_user_post:
+        # 포스트 첨부(관리자 전용)는 허브 /media가 내려주지 않으므로 항상 Streamlit으로 보여 줍니다.
         if file_type.startswith('image/'):
-            base64_data = get_file_as_base64(file_path)
-            if base64_data:
-                st.image(
-                    f"data:{file_type};base64,{base64_data}",
-                    caption=f"🖼️ {file_name} ({file_size_kb} KB)",
-                    use_column_width=True
-                )
-            else:
-                # Base64 인코딩 실패 시 다운로드 버튼 표시
-                try:
-                    with open(file_path, "rb") as f:
-                        st.download_button(
-                            label=f"⬇️ {file_name} 다운로드 (이미지 인라인 실패)",
-                            data=f.read(),
-                            file_name=file_name,
-                            mime=file_type,
-                            key=f"{key_prefix}_download_{notice_id}_{file_name}_imgfallback"
-                        )
-                except Exception:
-                    pass
-            
+            # 목록에는 휴대폰 화면 크기 축소본을 싣습니다 (아직 없으면 원본).
+            st.image(
+                media.variant_path(file_info, "mobile"),
+                caption=f"🖼️ {file_name} ({file_size_kb} KB)",
+                use_container_width=True
+            )
         elif file_type.startswith('video/'):
-            # st.video는 파일 경로를 직접 받지 못하므로 파일을 읽어 전달
-            try:
-                st.video(open(file_path, 'rb').read(), format=file_type, start_time=0)
-                st.markdown(f"**🎬 {file_name} ({file_size_kb} KB)**")
-            except Exception:
-                st.markdown(f"**🎬 {file_name} ({file_size_kb} KB)** (비디오 로드 실패)")
-            
+            # 경로를 넘기면 Streamlit 미디어 서버가 파일을 전송합니다.
+            st.video(file_path, format=file_type, start_time=0)
+            st.markdown(f"**🎬 {file_name} ({file_size_kb} KB)**")
         else:
             icon = "📄"
             try:
@@ -333,68 +115,66 @@ def display_and_download_file(file_info, notice_id, is_admin=False, is_user_post
             except Exception:
                 pass
     else:
-        st.markdown(f"**{file_name}** (파일을 찾을 수 없습니다.)")
-
+        file_url = media.media_url(file_path)
+        
+        if file_type.startswith('image/'):
+            # 목록에는 축소본만 싣고, 원본은 클릭했을 때만 불러옵니다.
+            thumb_url = media.variant_url(file_info, "thumb")
+            mobile_url = media.variant_url(file_info, "mobile")
+            full_url = media.variant_url(file_info, "full")
+            placeholder_url = media.placeholder_url(file_info)
+            placeholder_style = f"background: url('{placeholder_url}') center / cover no-repeat;" if placeholder_url else ""
+            st.markdown(
+                f'<a href="{full_url}" target="_blank">'
+                f'<img src="{thumb_url}" srcset="{thumb_url} 320w, {mobile_url} 960w" '
+                f'sizes="(max-width: 640px) 100vw, 320px" loading="lazy" alt="{html.escape(file_name)}" '
+                f'style="max-width: 100%; border-radius: 5px; {placeholder_style}"></a>'
+                f'<div style="font-size: 0.85em; color: #AAAAAA;">🖼️ {html.escape(file_name)} ({file_size_kb} KB)</div>',
+                unsafe_allow_html=True
+            )
+            
+        elif file_type.startswith('video/'):
+            # 브라우저가 Range 요청으로 필요한 부분만 받아 재생/탐색합니다.
+            st.video(file_url, format=file_type, start_time=0)
+            st.markdown(f"**🎬 {file_name} ({file_size_kb} KB)**")
+            
+        else:
+            icon = "📄"
+            download_url = media.media_url(file_path, download_name=file_name)
+            st.markdown(
+                f'<a href="{download_url}" target="_blank">⬇️ {icon} {html.escape(file_name)} ({file_size_kb} KB)</a>',
+                unsafe_allow_html=True
+            )
 
-# --- JSON 헬퍼 ---
-def load_json(f):
-    if os.path.exists(f):
-        try:
-            with open(f, "r", encoding="utf-8") as file:
-                return json.load(file)
-        except json.JSONDecodeError:
-            return []
-    return []
 
+# --- JSON 헬퍼 (저장소: storage.py, SQLite WAL) ---
 def save_json(f, d):
+    """컬렉션 전체를 d로 맞춥니다. 바뀐 레코드만 기록됩니다."""
     try:
-        with open(f, "w", encoding="utf-8") as file:
-            json.dump(d, file, ensure_ascii=False, indent=2)
-    except Exception:
-        # 파일 저장 오류 무시
+        storage.replace_all(storage.collection_for(f), d)
+    except sqlite3.Error:
+        # 저장 오류 무시
         pass
-        
-# --- NEW: 거리 및 시간 계산 함수 ---
-def haversine(lat1, lon1, lat2, lon2):
-    """두 위도/경도 쌍 사이의 지구 표면 거리를 km 단위로 계산합니다 (Haversine 공식)."""
-    R = 6371  # 지구 반지름 (km)
-
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
 
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
+# --- 레코드 단위 저장 헬퍼 (동시 수정 시 서로의 변경을 덮어쓰지 않음) ---
+def add_record(f, record):
+    try:
+        return storage.insert(storage.collection_for(f), record)
+    except sqlite3.Error:
+        return None
 
-    a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
-    c = 2 * asin(sqrt(a))
-    distance = R * c
-    return distance
+def update_record(f, record_id, fields):
+    try:
+        return storage.update(storage.collection_for(f), record_id, fields)
+    except sqlite3.Error:
+        return None
 
-def calculate_distance_and_time(p1, p2):
-    """두 좌표 사이의 거리와 예상 소요 시간을 문자열로 반환합니다."""
-    lat1, lon1 = p1
-    lat2, lon2 = p2
-    distance_km = haversine(lat1, lon1, lat2, lon2)
-    
-    if distance_km < 500:
-        avg_speed_kmh = 60
-    else:
-        avg_speed_kmh = 80
+def remove_record(f, record_id):
+    try:
+        return storage.delete(storage.collection_for(f), record_id)
+    except sqlite3.Error:
+        return False
         
-    travel_time_h = distance_km / avg_speed_kmh
-    
-    distance_str = f"{distance_km:.1f} km"
-    
-    hours = int(travel_time_h)
-    minutes = int((travel_time_h - hours) * 60)
-    
-    if hours > 0:
-        time_str = f"{hours}시간 {minutes}분"
-    else:
-        time_str = f"{minutes}분"
-
-    return f"거리: {distance_str} | 예상 시간: {time_str}"
-
-
 # =============================================================================
 # NEW: 일정 데이터만 삭제하는 함수 (요청 사항)
 # =============================================================================
@@ -418,7 +198,16 @@ def delete_all_admin_data():
     """
     모든 투어 데이터 (일정, 공지사항, 사용자 포스트) 및 첨부 파일을 삭제하고 초기화합니다.
     """
-    global tour_schedule, tour_notices, user_posts
+    global tour_schedule
+    
+    # 0. 첨부파일 참조 해제 (마지막 참조가 사라진 파일만 삭제됨). 한 번만 읽으므로 공유 캐시를 거치지 않습니다.
+    try:
+        records = storage.load(storage.collection_for(NOTICE_FILE)) + storage.load(storage.collection_for(USER_POST_FILE))
+    except sqlite3.Error:
+        records = []
+    for record in records:
+        for file_info in record.get('files', []):
+            media.release_file(file_info)
     
     # 1. JSON 파일 초기화 및 저장
     # CITY_FILE: 투어 일정 데이터 (완전 삭제)
@@ -426,24 +215,12 @@ def delete_all_admin_data():
     save_json(CITY_FILE, []) 
     
     # NOTICE_FILE: 공지사항 데이터 (완전 삭제)
-    tour_notices = []
     save_json(NOTICE_FILE, [])
     
     # USER_POST_FILE: 사용자 포스트 데이터 (완전 삭제)
-    user_posts = []
     save_json(USER_POST_FILE, [])
     
-    # 2. 업로드된 파일 삭제 (공지사항 및 사용자 포스트 미디어)
-    if os.path.exists(UPLOAD_DIR):
-        for filename in os.listdir(UPLOAD_DIR):
-            file_path = os.path.join(UPLOAD_DIR, filename)
-            try:
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-            except Exception:
-                pass
-    
-    # 3. 세션 상태 초기화 및 재실행
+    # 2. 세션 상태 초기화 및 재실행
     st.session_state.admin = False
     st.session_state.logged_in_user = None
     st.session_state.show_login_form = False
@@ -454,95 +231,77 @@ def delete_all_admin_data():
 # =============================================================================
 
 
-# --- 도시 목록 및 좌표 정의 (생략 없음) ---
-city_dict = {
-    "Ahmadnagar": {"lat": 19.095193, "lon": 74.749596}, "Akola": {"lat": 20.702269, "lon": 77.004699},
-    "Ambernath": {"lat": 19.186354, "lon": 73.191948}, "Amravati": {"lat": 20.93743, "lon": 77.779271},
-    "Aurangabad": {"lat": 19.876165, "lon": 75.343314}, "Badlapur": {"lat": 19.1088, "lon": 73.1311},
-    "Bhandara": {"lat": 21.180052, "lon": 79.564987}, "Bhiwandi": {"lat": 19.300282, "lon": 73.069645},
-    "Bhusawal": {"lat": 21.02606, "lon": 75.830095}, "Chandrapur": {"lat": 19.957275, "lon": 79.296875},
-    "Chiplun": {"lat": 17.5322, "lon": 73.516}, "Dhule": {"lat": 20.904964, "lon": 74.774651},
-    "Dombivli": {"lat": 19.2183, "lon": 73.0865}, "Gondia": {"lat": 21.4598, "lon": 80.195},
-    "Hingoli": {"lat": 19.7146, "lon": 77.1424}, "Ichalkaranji": {"lat": 16.6956, "lon": 74.4561},
-    "Jalgaon": {"lat": 21.007542, "lon": 75.562554}, "Jalna": {"lat": 19.833333, "lon": 75.883333},
-    "Kalyan": {"lat": 19.240283, "lon": 73.13073}, "Karad": {"lat": 17.284, "lon": 74.1779},
-    "Karanja": {"lat": 20.7083, "lon": 76.93}, "Karanja Lad": {"lat": 20.3969, "lon": 76.8908},
-    "Karjat": {"lat": 18.9121, "lon": 73.3259}, "Kavathe Mahankal": {"lat": 17.218, "lon": 74.416},
-    "Khamgaon": {"lat": 20.691, "lon": 76.6886}, "Khopoli": {"lat": 18.6958, "lon": 73.3207},
-    "Kolad": {"lat": 18.5132, "lon": 73.2166}, "Kolhapur": {"lat": 16.691031, "lon": 74.229523},
-    "Kopargaon": {"lat": 19.883333, "lon": 74.483333}, "Koparkhairane": {"lat": 19.0873, "lon": 72.9856},
-    "Kothrud": {"lat": 18.507399, "lon": 73.807648}, "Kudal": {"lat": 16.033333, "lon": 73.683333},
-    "Kurla": {"lat": 19.0667, "lon": 72.8833}, "Latur": {"lat": 18.406526, "lon": 76.560229},
-    "Lonavala": {"lat": 18.75, "lon": 73.4}, "Mahad": {"lat": 18.086, "lon": 73.3006},
-    "Malegaon": {"lat": 20.555256, "lon": 74.525539}, "Malkapur": {"lat": 20.4536, "lon": 76.3886},
-    "Manmad": {"lat": 20.3333, "lon": 74.4333}, "Mira-Bhayandar": {"lat": 19.271112, "lon": 72.854094},
-    "Mumbai": {"lat": 19.07609, "lon": 72.877426}, "Nagpur": {"lat": 21.1458, "lon": 79.088154},
-    "Nanded": {"lat": 19.148733, "lon": 77.321011}, "Nandurbar": {"lat": 21.317, "lon": 74.02},
-    "Nashik": {"lat": 20.011645, "lon": 73.790332}, "Niphad": {"lat": 20.074, "lon": 73.834},
-    "Osmanabad": {"lat": 18.169111, "lon": 76.035309}, "Palghar": {"lat": 19.691644, "lon": 72.768478},
-    "Panaji": {"lat": 15.4909, "lon": 73.8278}, "Panvel": {"lat": 18.989746, "lon": 73.117069},
-    "Parbhani": {"lat": 19.270335, "lon": 76.773347}, "Peth": {"lat": 18.125, "lon": 74.514},
-    "Phaltan": {"lat": 17.9977, "lon": 74.4066}, "Pune": {"lat": 18.52043, "lon": 73.856743},
-    "Raigad": {"lat": 18.515048, "lon": 73.179436}, "Ramtek": {"lat": 21.3142, "lon": 79.2676},
-    "Ratnagiri": {"lat": 16.990174, "lon": 73.311902}, "Sangli": {"lat": 16.855005, "lon": 74.56427},
-    "Sangole": {"lat": 17.126, "lon": 75.0331}, "Saswad": {"lat": 18.3461, "lon": 74.0335},
-    "Satara": {"lat": 17.688481, "lon": 73.993631}, "Sawantwadi": {"lat": 15.8964, "lon": 73.7626},
-    "Shahada": {"lat": 21.1167, "lon": 74.5667}, "Shirdi": {"lat": 19.7667, "lon": 74.4771},
-    "Shirpur": {"lat": 21.1286, "lon": 74.4172}, "Shirur": {"lat": 18.7939, "lon": 74.0305},
-    "Shrirampur": {"lat": 19.6214, "lon": 73.8653}, "Sinnar": {"lat": 19.8531, "lon": 73.9976},
-    "Solan": {"lat": 30.9083, "lon": 77.0989}, "Solapur": {"lat": 17.659921, "lon": 75.906393},
-    "Talegaon": {"lat": 18.7519, "lon": 73.487}, "Thane": {"lat": 19.218331, "lon": 72.978088},
-    "Achalpur": {"lat": 20.1833, "lon": 77.6833}, "Akot": {"lat": 21.1, "lon": 77.1167},
-    "Ambajogai": {"lat": 18.9667, "lon": 76.6833}, "Amalner": {"lat": 21.0333, "lon": 75.3333},
-    "Anjangaon Surji": {"lat": 21.1167, "lon": 77.8667}, "Arvi": {"lat": 20.45, "lon": 78.15},
-    "Ashti": {"lat": 18.0, "lon": 76.25}, "Atpadi": {"lat": 17.1667, "lon": 74.4167},
-    "Baramati": {"lat": 18.15, "lon": 74.6}, "Barshi": {"lat": 18.11, "lon": 76.06},
-    "Basmat": {"lat": 18.7, "lon": 77.856}, "Bhokar": {"lat": 19.5167, "lon": 77.3833},
-    "Biloli": {"lat": 19.5333, "lon": 77.2167}, "Chikhli": {"lat": 20.9, "lon": 76.0167},
-    "Daund": {"lat": 18.4667, "lon": 74.65}, "Deola": {"lat": 20.5667, "lon": 74.05},
-    "Dhanora": {"lat": 20.7167, "lon": 79.0167}, "Dharni": {"lat": 21.25, "lon": 78.2667},
-    "Dharur": {"lat": 18.0833, "lon": 76.7}, "Digras": {"lat": 19.45, "lon": 77.55},
-    "Dindori": {"lat": 21.0, "lon": 79.0}, "Erandol": {"lat": 21.0167, "lon": 75.2167},
-    "Faizpur": {"lat": 21.1167, "lon": 75.7167}, "Gadhinglaj": {"lat": 16.2333, "lon": 74.1333},
-    "Guhagar": {"lat": 16.4, "lon": 73.4}, "Hinganghat": {"lat": 20.0167, "lon": 78.7667},
-    "Igatpuri": {"lat": 19.6961, "lon": 73.5212}, "Junnar": {"lat": 19.2667, "lon": 73.8833},
-    "Kankavli": {"lat": 16.3833, "lon": 73.5167}, "Koregaon": {"lat": 17.2333, "lon": 74.1167},
-    "Kupwad": {"lat": 16.7667, "lon": 74.4667}, "Lonar": {"lat": 19.9833, "lon": 76.5167},
-    "Mangaon": {"lat": 18.1869, "lon": 73.2555}, "Mangalwedha": {"lat": 16.6667, "lon": 75.1333},
-    "Morshi": {"lat": 20.0556, "lon": 77.7647}, "Pandharpur": {"lat": 17.6658, "lon": 75.3203},
-    "Parli": {"lat": 18.8778, "lon": 76.65}, "Rahuri": {"lat": 19.2833, "lon": 74.5833},
-    "Raver": {"lat": 20.5876, "lon": 75.9002}, "Sangamner": {"lat": 19.3167, "lon": 74.5333},
-    "Savner": {"lat": 21.0833, "lon": 79.1333}, "Sillod": {"lat": 20.0667, "lon": 75.1833},
-    "Tumsar": {"lat": 20.4623, "lon": 79.5429}, "Udgir": {"lat": 18.4167, "lon": 77.1239},
-    "Ulhasnagar": {"lat": 19.218451, "lon": 73.16024}, "Vasai-Virar": {"lat": 19.391003, "lon": 72.839729},
-    "Wadgaon Road": {"lat": 18.52, "lon": 73.85}, "Wadwani": {"lat": 18.9, "lon": 76.69},
-    "Wai": {"lat": 17.9524, "lon": 73.8775}, "Wani": {"lat": 19.0, "lon": 78.002},
-    "Wardha": {"lat": 20.745445, "lon": 78.602452}, "Wardha Road": {"lat": 20.75, "lon": 78.6},
-    "Yavatmal": {"lat": 20.389917, "lon": 78.130051}
-}
+# --- 도시 목록/CSS는 constants.py (프로세스당 한 번만 만들어짐) ---
+city_dict = constants.city_dict
+city_options = constants.city_options
 
-major_cities_available = [c for c in ["Mumbai", "Pune", "Nagpur", "Thane", "Nashik", "Kalyan", "Vasai-Virar", "Aurangabad", "Solapur", "Mira-Bhayandar", "Bhiwandi", "Amravati", "Nanded", "Kolhapur", "Ulhasnagar", "Sangli", "Malegaon", "Jalgaon", "Akola", "Latur", "Dhule", "Ahmadnagar", "Chandrapur", "Parbhani", "Ichalkaranji", "Jalna", "Ambernath", "Bhusawal", "Panvel", "Dombivli"] if c in city_dict]
-remaining_cities = sorted([c for c in city_dict if c not in major_cities_available])
-city_options = major_cities_available + remaining_cities
 
+# --- 데이터 버전 (cantata.db에 컬렉션별로 저장, 변경 시마다 증가) ---
+try:
+    data_versions = storage.versions()
+except sqlite3.Error:
+    data_versions = {}
+notice_version = data_versions.get(storage.collection_for(NOTICE_FILE), 0)
+schedule_version = data_versions.get(storage.collection_for(CITY_FILE), 0)
+post_version = data_versions.get(storage.collection_for(USER_POST_FILE), 0)
 
-# --- 데이터 로드 (공지사항 및 투어 일정) ---
-tour_notices = load_json(NOTICE_FILE)
-tour_schedule = load_json(CITY_FILE) 
-user_posts = load_json(USER_POST_FILE) # <-- 사용자 포스트 로드
+# --- 데이터 로드 (투어 일정) ---
+# 공지사항/사용자 포스트는 화면에 보이는 페이지만 storage.page로 읽습니다 (record_page).
 
-# [수정] tour_schedule이 비어있으면 (즉, 파일이 비워진 경우) 빈 리스트로 확정하여 TBD 목록이 자동으로 로드되지 않게 합니다.
-if not tour_schedule:
-    tour_schedule = []
-# [제거] 이전에 TBD 목록을 자동으로 로드하던 복잡한 if/else 로직을 제거하여, '일정 전체 삭제' 후 앱을 재실행해도 데이터가 다시 생기지 않도록 보장합니다.
+# 투어 일정: 버전마다 한 번만 변환한 날짜순 models.ScheduleEntry 튜플 (관리자 목록, 지도, 중복 검사가 공유)
+try:
+    tour_schedule = models.schedule(schedule_version)
+except sqlite3.Error:
+    tour_schedule = ()
+
+# --- 페이지 단위 조회: 날짜 인덱스를 따라 보이는 페이지만 읽고, 버전이 같으면 캐시를 재사용합니다 ---
+PAGE_SIZE = 10
+
+# 페이지를 읽을 때 한 번만 변환할 모델
+PAGE_MODELS = {NOTICE_FILE: models.Notice, USER_POST_FILE: models.Post}
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def record_page(f, version, cursor):
+    """날짜 역순 한 페이지(모델 목록)와 다음 커서를 반환합니다. (version은 캐시 키)"""
+    try:
+        records, next_cursor = storage.page(storage.collection_for(f), cursor, PAGE_SIZE)
+    except sqlite3.Error:
+        return [], None
+    return models.parse(PAGE_MODELS[f], records), next_cursor
+
+def load_pages(f, version, pages):
+    """첫 페이지부터 pages개 페이지를 이어 읽어 (레코드 목록, 더 있는지)를 반환합니다."""
+    records, cursor = [], None
+    for _page_no in range(pages):
+        page_records, cursor = record_page(f, version, cursor)
+        records.extend(page_records)
+        if cursor is None:
+            break
+    return records, cursor is not None
+
+def visible_notices(version, pages, require_id=False):
+    notices, has_more = load_pages(NOTICE_FILE, version, pages)
+    return [n for n in notices if n.id or not require_id], has_more
+
+def visible_posts(version, pages):
+    return load_pages(USER_POST_FILE, version, pages)
+
+def load_more_button(state_key, button_key):
+    """'더 보기' 버튼: 다음 페이지까지 표시하도록 페이지 수를 늘립니다."""
+    if st.button(_("load_more"), key=button_key):
+        st.session_state[state_key] += 1
+        safe_rerun()
 
 
 # --- 관리자 및 UI 설정 ---
 ADMIN_PASS = "0009" # 비밀번호: '0009'
 
-# 관리자/일반 사용자 자동 새로고침
+# 일반 사용자 자동 새로고침: 허브(server.py)가 새 데이터 버전을 알릴 때만 재실행합니다.
 if not st.session_state.get("admin", False):
-    st_autorefresh(interval=10000, key="auto_refresh_user")
+    if live.enabled():
+        live.watch(storage.data_version(), key="live_updates")
+    else:
+        st_autorefresh(interval=10000, key="auto_refresh_user")
 
 # 제목 스타일
 title_html = f"""
@@ -557,11 +316,11 @@ st.markdown(title_html, unsafe_allow_html=True)
 # 언어 선택 버튼 (상단 고정)
 col_lang, col_auth = st.columns([1, 3])
 with col_lang:
-    LANG_OPTIONS = {"ko": "한국어", "en": "English", "hi": "हिन्दी"}
+    LANG_OPTIONS = i18n.languages()
     lang_keys = list(LANG_OPTIONS.keys())
     lang_display_names = list(LANG_OPTIONS.values())
     
-    current_lang_index = lang_keys.index(st.session_state.lang)
+    current_lang_index = lang_keys.index(_.locale)
 
     selected_lang_display = st.selectbox(
         _("menu"), 
@@ -638,6 +397,7 @@ with tab1:
     # 1. 관리자 공지사항 관리
     if st.session_state.admin:
         st.subheader(f"🔔 {_('existing_notices')} (관리자 모드)")
+        show_upload_errors()
         
         # --- 관리자: 공지사항 등록/수정 폼 ---
         with st.expander(_("register"), expanded=False):
@@ -652,14 +412,14 @@ with tab1:
                     key="notice_file_uploader"
                 )
                 
-                type_options = {"General": _("general"), "Urgent": _("urgent")}
-                selected_display_type = st.radio(_("type"), list(type_options.values()))
-                notice_type = list(type_options.keys())[list(type_options.values()).index(selected_display_type)]
+                selected_display_type = st.radio(_("type"), list(_.notice_types.values()))
+                notice_type = _.notice_type_keys[selected_display_type]
                 
                 submitted = st.form_submit_button(_("register"))
                 
                 if submitted and notice_title and notice_content:
-                    file_info_list = save_uploaded_files(uploaded_files)
+                    file_info_list, upload_errors = save_uploaded_files(uploaded_files)
+                    st.session_state.upload_errors = upload_errors
                     
                     new_notice = {
                         "id": str(uuid.uuid4()),
@@ -669,42 +429,39 @@ with tab1:
                         "files": file_info_list, # 파일 정보 저장
                         "date": datetime.now(timezone('Asia/Kolkata')).strftime("%Y-%m-%d %H:%M:%S")
                     }
-                    tour_notices.insert(0, new_notice)
-                    save_json(NOTICE_FILE, tour_notices)
+                    add_record(NOTICE_FILE, new_notice)
                     safe_rerun()
                 elif submitted:
                     pass
         
         # --- 관리자: 공지사항 목록 및 수정/삭제 ---
-        valid_notices = [n for n in tour_notices if isinstance(n, dict) and n.get('id') and n.get('title')]
-        notices_to_display = sorted(valid_notices, key=lambda x: x.get('date', '9999-12-31'), reverse=True)
-        type_options_rev = {"General": _("general"), "Urgent": _("urgent")}
+        notices_to_display, more_notices = visible_notices(notice_version, st.session_state.notice_pages, require_id=True)
+        type_options_rev = _.notice_types
         
         for notice in notices_to_display:
-            notice_id = notice['id']
-            notice_type_key = notice.get('type', 'General')
-            translated_type = type_options_rev.get(notice_type_key, _("general"))
-            notice_title = notice['title']
+            notice_id = notice.id
+            notice_type_key = notice.type
+            translated_type = type_options_rev[notice_type_key]
+            notice_title = notice.title
             
             prefix = "🚨 " if notice_type_key == "Urgent" else ""
-            header_text = f"{prefix}[{translated_type}] {notice_title} ({notice.get('date', 'N/A')[:10]})"
+            header_text = f"{prefix}[{translated_type}] {notice_title} ({notice.date_str[:10]})"
             
             with st.expander(header_text, expanded=False):
                 col_del, col_title = st.columns([1, 4])
                 with col_del:
                     if st.button(_("remove"), key=f"del_n_{notice_id}", help=_("remove")):
-                        for file_info in notice.get('files', []):
-                            if os.path.exists(file_info['path']):
-                                os.remove(file_info['path'])
+                        # 다른 공지/포스트가 같은 파일을 쓰고 있으면 참조만 해제됩니다.
+                        for file_info in notice.files:
+                            media.release_file(file_info)
                         
-                        tour_notices[:] = [n for n in tour_notices if n.get('id') != notice_id]
-                        save_json(NOTICE_FILE, tour_notices)
+                        remove_record(NOTICE_FILE, notice_id)
                         safe_rerun()
                 
                 with col_title:
-                    st.markdown(f"**{_('content')}:** {notice.get('content', _('no_content'))}")
+                    st.markdown(f"**{_('content')}:** {notice.content or _('no_content')}")
                     
-                    attached_files = notice.get('files', [])
+                    attached_files = notice.files
                     if attached_files:
                         st.markdown(f"**{_('attached_files')}:**")
                         for file_info in attached_files:
@@ -715,53 +472,54 @@ with tab1:
                 with st.form(f"update_notice_{notice_id}", clear_on_submit=True):
                     current_type_index = list(type_options_rev.keys()).index(notice_type_key)
                     updated_display_type = st.radio(_("type"), list(type_options_rev.values()), index=current_type_index, key=f"update_type_{notice_id}")
-                    updated_type_key = list(type_options_rev.keys())[list(type_options_rev.values()).index(updated_display_type)]
+                    updated_type_key = _.notice_type_keys[updated_display_type]
                     
-                    updated_content = st.text_area(_("update_content"), value=notice.get('content', ''))
+                    updated_content = st.text_area(_("update_content"), value=notice.content)
                     
                     if st.form_submit_button(_("update")):
-                        for n in tour_notices:
-                            if n.get('id') == notice_id:
-                                n['content'] = updated_content
-                                n['type'] = updated_type_key
-                                save_json(NOTICE_FILE, tour_notices)
-                                safe_rerun()
-                                break
+                        if update_record(NOTICE_FILE, notice_id, {"content": updated_content, "type": updated_type_key}):
+                            safe_rerun()
+        
+        if more_notices:
+            load_more_button("notice_pages", "more_notices_admin")
         
     # 2. 일반 사용자 공지사항 & 포스트 보기
     if not st.session_state.admin:
         st.subheader(f"📢 {_('tab_notice')}")
         
         # --- 공지사항 목록 ---
-        valid_notices = [n for n in tour_notices if isinstance(n, dict) and n.get('title')]
-        if not valid_notices:
+        notices_to_display, more_notices = visible_notices(notice_version, st.session_state.notice_pages)
+        if not notices_to_display and not more_notices:
             st.write(_("no_notices"))
         else:
-            notices_to_display = sorted(valid_notices, key=lambda x: x.get('date', '9999-12-31'), reverse=True)
-            type_options_rev = {"General": _("general"), "Urgent": _("urgent")}
+            type_options_rev = _.notice_types
             
             for notice in notices_to_display:
-                notice_id = notice.get('id')
-                notice_type_key = notice.get('type', 'General')
-                translated_type = type_options_rev.get(notice_type_key, _("general"))
-                notice_title = notice.get('title', _("no_title"))
-                notice_content = notice.get('content', _("no_content"))
+                notice_id = notice.id
+                notice_type_key = notice.type
+                translated_type = type_options_rev[notice_type_key]
+                notice_title = notice.title
+                notice_content = notice.content or _("no_content")
                 
                 prefix = "🚨 " if notice_type_key == "Urgent" else ""
-                header_text = f"{prefix}[{translated_type}] {notice_title} - *{notice.get('date', 'N/A')[:16]}*"
+                header_text = f"{prefix}[{translated_type}] {notice_title} - *{notice.date_str[:16]}*"
                 
                 with st.expander(header_text, expanded=False): 
                     st.markdown(f'<div class="notice-content-box">{notice_content}</div>', unsafe_allow_html=True)
 
                     # --- 파일 첨부 표시 (일반 사용자 모드) ---
-                    attached_files = notice.get('files', [])
+                    attached_files = notice.files
                     if attached_files:
                         st.markdown(f"**{_('attached_files')}:**")
                         for file_info in attached_files:
                             display_and_download_file(file_info, notice_id, is_admin=False, is_user_post=False)
+            
+            if more_notices:
+                load_more_button("notice_pages", "more_notices_user")
         
     # 3. 사용자 포스트 섹션 (관리자/일반 사용자 공통)
     st.subheader(f"📸 {_('user_posts')}") 
+    show_upload_errors()
     
     # --- 사용자 포스트 작성 폼 (일반 사용자 모두 허용) ---
     with st.expander(_("new_post"), expanded=False):
@@ -777,7 +535,8 @@ with tab1:
             post_submitted = st.form_submit_button(_("register"))
             
             if post_submitted and (post_content or uploaded_media):
-                media_info_list = save_uploaded_files(uploaded_media) 
+                media_info_list, upload_errors = save_uploaded_files(uploaded_media)
+                st.session_state.upload_errors = upload_errors
                 
                 new_post = {
                     "id": str(uuid.uuid4()),
@@ -785,43 +544,44 @@ with tab1:
                     "files": media_info_list, 
                     "date": datetime.now(timezone('Asia/Kolkata')).strftime("%Y-%m-%d %H:%M:%S")
                 }
-                user_posts.insert(0, new_post)
-                save_json(USER_POST_FILE, user_posts)
+                add_record(USER_POST_FILE, new_post)
                 safe_rerun()
             elif post_submitted:
                 pass
         
     # --- 사용자 포스트 목록 표시 ---
-    valid_posts = [p for p in user_posts if isinstance(p, dict) and (p.get('content') or p.get('files'))]
-    posts_to_display = sorted(valid_posts, key=lambda x: x.get('date', '9999-12-31'), reverse=True)
+    posts_to_display, more_posts = visible_posts(post_version, st.session_state.post_pages)
     
-    if not posts_to_display:
+    if not posts_to_display and not more_posts:
         st.write(_("no_posts"))
     else:
         for post in posts_to_display:
-            post_id = post['id']
+            post_id = post.id
             
-            header = f"익명 사용자 포스트 - *{post.get('date', 'N/A')[:16]}*"
+            header = f"익명 사용자 포스트 - *{post.date_str[:16]}*"
             
             # 관리자 모드는 확장자로 표시
             if st.session_state.admin:
                 with st.expander(header, expanded=False):
-                    st.markdown(f'<div class="notice-content-box">{post.get("content", _("no_content"))}</div>', unsafe_allow_html=True)
+                    st.markdown(f'<div class="notice-content-box">{post.content or _("no_content")}</div>', unsafe_allow_html=True)
                     
-                    attached_media = post.get('files', [])
+                    attached_media = post.files
                     if attached_media:
                         for file_info in attached_media:
                             display_and_download_file(file_info, post_id, is_admin=True, is_user_post=True)
             else:
                 # 일반 사용자는 내용과 파일 경고만 표시
-                st.markdown(f"**익명 사용자** - *{post.get('date', 'N/A')[:16]}*")
-                st.markdown(f'<div class="notice-content-box">{post.get("content", _("no_content"))}</div>', unsafe_allow_html=True)
+                st.markdown(f"**익명 사용자** - *{post.date_str[:16]}*")
+                st.markdown(f'<div class="notice-content-box">{post.content or _("no_content")}</div>', unsafe_allow_html=True)
                 
-                attached_media = post.get('files', [])
+                attached_media = post.files
                 if attached_media:
                     # 파일이 첨부되었음을 알리는 텍스트만 표시
                     st.markdown(f"**{_('attached_files')}:** {_('admin_only_files')}")
         
+        if more_posts:
+            load_more_button("post_pages", "more_posts")
+        
 
 # =============================================================================
 # 탭 2: 투어 경로 (Map)
@@ -850,20 +610,21 @@ with tab2:
             # 오류 발생 지점: _() 호출 대신 직접 문자열 사용으로 안정성 강화
             st.warning(_("confirm_schedule_delete_q"), icon="⚠️")
             
-            confirm_col1, confirm_col2, _ = st.columns([1, 1, 3])
+            # 세 번째 열을 '_'로 받으면 번역 함수가 가려지므로 다른 이름을 사용합니다.
+            confirm_col1, confirm_col2, _confirm_spacer = st.columns([1, 1, 3])
             
             with confirm_col1:
                 # [안정화 수정] _("confirm_yes") 대신 직접 문자열을 사용하거나,
                 # _("confirm_yes")가 None일 때의 폴백(Fallback)을 추가하여 TypeError 방지
                 
                 # 번역 함수가 None인 경우를 대비하여 직접 언어 딕셔너리에 접근하거나, 문자열을 사용
-                confirm_yes_label = LANG[st.session_state.lang].get("confirm_yes", "Yes, Delete") 
+                confirm_yes_label = _.get("confirm_yes", "Yes, Delete") 
                 
                 if st.button(confirm_yes_label, key="confirm_schedule_yes", type="primary", use_container_width=True):
                     clear_tour_schedule_data() # JSON 파일 초기화 및 Rerun
                     
             with confirm_col2:
-                confirm_no_label = LANG[st.session_state.lang].get("confirm_no", "No, Cancel")
+                confirm_no_label = _.get("confirm_no", "No, Cancel")
 
                 if st.button(confirm_no_label, key="confirm_schedule_no", type="secondary", use_container_width=True):
                     st.session_state['confirm_schedule_delete'] = False
@@ -872,6 +633,20 @@ with tab2:
         
         
         with st.expander(_("add_city"), expanded=False):
+            # 다음 공연지 근처의 아직 일정이 없는 도시 추천 (geo.city_index: KD-트리)
+            upcoming_stops = [
+                s for s in tour_schedule if s.city in city_dict and s.date is not None and s.date >= date.today()
+            ]
+            if upcoming_stops:
+                next_city = upcoming_stops[0].city
+                scheduled_cities = {s.city for s in tour_schedule}
+                nearby = geo.city_index(city_dict).nearest(
+                    city_dict[next_city]['lat'], city_dict[next_city]['lon'], k=5, exclude=scheduled_cities
+                )
+                if nearby:
+                    nearby_text = ", ".join(f"{name} ({km:.0f} km)" for name, km in nearby)
+                    st.caption(f"💡 {_('nearby_cities')} ({next_city}): {nearby_text}")
+            
             with st.form("schedule_form", clear_on_submit=True):
                 col_c, col_d, col_v = st.columns(3)
                 
@@ -881,9 +656,8 @@ with tab2:
                 
                 col_l, col_s, col_n, col_p = st.columns(4)
                 
-                type_options_map = {_("indoor"): "indoor", _("outdoor"): "outdoor"} # Display -> Internal Key
-                selected_display_type = col_l.radio(_("type"), list(type_options_map.keys()))
-                type_sel = type_options_map[selected_display_type] # Internal key
+                selected_display_type = col_l.radio(_("type"), list(_.schedule_type_keys.keys()))
+                type_sel = _.schedule_type_keys[selected_display_type] # Internal key
                 
                 expected_seats = col_s.number_input(_("seats"), min_value=0, value=500, step=50, help=_("seats_tooltip"))
                 google_link = col_n.text_input(_("google_link"), placeholder=_("google_link_placeholder"))
@@ -901,9 +675,9 @@ with tab2:
                     elif city_name_input not in city_dict:
                         st.error(_("city_coords_error"))
                     else:
-                        is_duplicate = any(
-                            s.get('city') == city_name_input and s.get('date') == schedule_date.strftime("%Y-%m-%d")
-                            for s in tour_schedule
+                        # (도시, 날짜) 해시 인덱스로 바로 확인합니다.
+                        is_duplicate = models.schedule_index(schedule_version).has(
+                            city_name_input, schedule_date.strftime("%Y-%m-%d")
                         )
                         
                         if is_duplicate:
@@ -924,30 +698,101 @@ with tab2:
                                 "probability": probability, # NEW: 가능성 저장
                                 "reg_date": datetime.now(timezone('Asia/Kolkata')).strftime("%Y-%m-%d %H:%M:%S")
                             }
-                            tour_schedule.append(new_schedule_entry)
-                            save_json(CITY_FILE, tour_schedule)
+                            add_record(CITY_FILE, new_schedule_entry)
                             st.toast(_("schedule_reg_success"), icon='🎉')
                             safe_rerun()
                 
         
+        # --- 관리자: 경로 제안 (route.py: 고정 일정 사이 빈 날짜에 총 거리가 짧도록 배치) ---
+        with st.expander(_("route_planner"), expanded=False):
+            col_rc, col_rd = st.columns([3, 1])
+            route_candidates = col_rc.multiselect(_("candidate_cities"), options=city_options, key="route_candidates")
+            route_start_date = col_rd.date_input(_("start_date"), value=date.today(), key="route_start_date")
+            
+            if st.button(_("suggest_route"), key="suggest_route_btn") and route_candidates:
+                fixed_stops = [(s.city, s.date) for s in tour_schedule if s.date is not None]
+                # 시작 날짜 직전의 마지막 일정 도시에서 출발
+                earlier_stops = [stop for stop in fixed_stops if stop[1] < route_start_date]
+                start_city = max(earlier_stops, key=lambda x: x[1])[0] if earlier_stops else None
+                st.session_state.route_plan = route.plan_route(
+                    route_candidates, fixed_stops, route_start_date, city_dict, start_city=start_city,
+                    scheduled_cities=models.schedule_index(schedule_version).cities(),
+                )
+            
+            route_plan = st.session_state.get("route_plan")
+            if route_plan:
+                st.markdown(f"**{_('total_distance')}:** {route_plan.total_km:.1f} km | **{_('travel_time')}:** {route_plan.total_hours:.1f} h")
+                for stop in route_plan.stops:
+                    stop_marker = f"📌 ({_('fixed_stop')})" if stop.fixed else "➕"
+                    st.markdown(f"{stop_marker} {stop.date.strftime('%Y-%m-%d')} — {stop.city}")
+                if route_plan.unplaced:
+                    st.warning(f"{_('unplaced_cities')}: {', '.join(route_plan.unplaced)}")
+                if route_plan.scheduled:
+                    st.info(f"{_('already_scheduled_cities')}: {', '.join(route_plan.scheduled)}")
+                
+                if st.button(_("add_plan_to_schedule"), key="add_route_plan_btn"):
+                    schedule_index = models.schedule_index(schedule_version)
+                    for stop in route_plan.stops:
+                        stop_date_str = stop.date.strftime("%Y-%m-%d")
+                        if stop.fixed or schedule_index.has(stop.city, stop_date_str):
+                            continue
+                        city_coords = city_dict[stop.city]
+                        add_record(CITY_FILE, {
+                            "id": str(uuid.uuid4()),
+                            "city": stop.city,
+                            "venue": "TBD",
+                            "lat": city_coords["lat"],
+                            "lon": city_coords["lon"],
+                            "date": stop_date_str,
+                            "type": "indoor",
+                            "seats": "500",
+                            "note": "",
+                            "google_link": "",
+                            "probability": 100,
+                            "reg_date": datetime.now(timezone('Asia/Kolkata')).strftime("%Y-%m-%d %H:%M:%S")
+                        })
+                    st.session_state.route_plan = None
+                    st.toast(_("schedule_reg_success"), icon='🎉')
+                    safe_rerun()
+        
+        # --- 관리자: 투어 통계 (analytics.py: 일정 버전마다 한 번 계산, 자동 새로고침에는 캐시 사용) ---
+        with st.expander(f"📊 {_('tour_analytics')}", expanded=False):
+            tour_stats = analytics.tour_stats(schedule_version, travel.model(city_dict))
+            col_ea, col_ts, col_km, col_h = st.columns(4)
+            col_ea.metric(_("expected_attendance"), f"{tour_stats.expected_attendance:,.0f}")
+            col_ts.metric(_("total_seats"), f"{tour_stats.total_seats:,}")
+            col_km.metric(_("total_distance"), f"{tour_stats.total_km:,.1f} km")
+            col_h.metric(_("travel_time"), f"{tour_stats.total_hours:,.1f} h")
+            
+            if len(tour_stats.weekly):
+                st.markdown(f"**{_('weekly_summary')}**")
+                st.bar_chart(tour_stats.weekly[["expected", "km"]])
+                st.dataframe(tour_stats.weekly.round(1), use_container_width=True)
+            
+            st.markdown(f"**{_('type_split')}**")
+            st.dataframe(
+                tour_stats.by_type.rename(index=_.schedule_types).round(1),
+                use_container_width=True
+            )
+            
+            if len(tour_stats.route) > 1:
+                st.markdown(f"**{_('cumulative_distance')}**")
+                st.line_chart(tour_stats.route.set_index("date")["cum_km"])
+        
         # --- 관리자: 일정 보기 및 수정/삭제 (안정성 강화) ---
-        valid_schedule = [
-            item 
-            for item in tour_schedule 
-            if isinstance(item, dict) and item.get('id') and item.get('city') and item.get('venue')
-        ]
+        # tour_schedule은 이미 검증/날짜순 정렬된 ScheduleEntry 튜플입니다.
+        valid_schedule = [item for item in tour_schedule if item.venue]
         
         if valid_schedule:
             # st.subheader(_("tour_schedule_management")) # 헤더는 이미 위에서 표시했음
-            schedule_dict = {item['id']: item for item in valid_schedule}
-            sorted_schedule_items = sorted(schedule_dict.items(), key=lambda x: x[1].get('date', '9999-12-31'))
-            type_options_map_rev = {"indoor": _("indoor"), "outdoor": _("outdoor")} # Internal Key -> Display
+            type_options_map_rev = _.schedule_types # Internal Key -> Display
 
-            for item_id, item in sorted_schedule_items:
-                translated_type = type_options_map_rev.get(item.get('type', 'outdoor'), _("outdoor"))
-                probability_val = item.get('probability', 100) 
+            for item in valid_schedule:
+                item_id = item.id
+                translated_type = type_options_map_rev[item.type]
+                probability_val = item.probability
                 
-                header_text = f"[{item.get('date', 'N/A')}] {item['city']} - {item['venue']} ({translated_type}) | {_('probability')}: {probability_val}%"
+                header_text = f"[{item.date_str or 'N/A'}] {item.city} - {item.venue} ({translated_type}) | {_('probability')}: {probability_val}%"
 
                 with st.expander(header_text, expanded=False):
                     col_u, col_d = st.columns([1, 5])
@@ -957,8 +802,7 @@ with tab2:
                             st.session_state[f"edit_mode_{item_id}"] = True
                             safe_rerun()
                         if st.button(_("remove"), key=f"del_s_{item_id}", use_container_width=True):
-                            tour_schedule[:] = [s for s in tour_schedule if s.get('id') != item_id]
-                            save_json(CITY_FILE, tour_schedule)
+                            remove_record(CITY_FILE, item_id)
                             st.toast(_("schedule_del_success"), icon='🗑️')
                             safe_rerun()
 
@@ -966,349 +810,87 @@ with tab2:
                         with st.form(f"edit_form_{item_id}"):
                             col_uc, col_ud, col_uv = st.columns(3)
                             
-                            updated_city = col_uc.selectbox(_("city"), city_options, index=city_options.index(item.get('city', "Pune") if item.get('city') in city_options else city_options[0]))
+                            updated_city = col_uc.selectbox(_("city"), city_options, index=city_options.index(item.city if item.city in city_options else city_options[0]))
                             
-                            try:
-                                initial_date = datetime.strptime(item.get('date', '2025-01-01'), "%Y-%m-%d").date()
-                            except ValueError:
-                                initial_date = date.today()
+                            initial_date = item.date or date.today()
                                 
                             updated_date = col_ud.date_input(_("date"), value=initial_date)
-                            updated_venue = col_uv.text_input(_("venue"), value=item.get('venue'))
+                            updated_venue = col_uv.text_input(_("venue"), value=item.venue)
                             
                             col_ul, col_us, col_ug, col_up = st.columns(4) 
-                            current_map_type = item.get('type', 'outdoor')
-                            current_map_index = 0 if current_map_type == "indoor" else 1
+                            current_map_index = 0 if item.type == "indoor" else 1
                             map_type_list = list(type_options_map_rev.values())
                             updated_display_type = col_ul.radio(_("type"), map_type_list, index=current_map_index, key=f"update_map_type_{item_id}")
-                            updated_type = "indoor" if updated_display_type == _("indoor") else "outdoor"
+                            updated_type = _.schedule_type_keys[updated_display_type]
                             
-                            seats_value = item.get('seats', '0')
-                            updated_seats = col_us.number_input(_("seats"), min_value=0, value=int(seats_value) if str(seats_value).isdigit() else 500, step=50)
-                            updated_google = col_ug.text_input(_("google_link"), value=item.get('google_link', ''))
+                            updated_seats = col_us.number_input(_("seats"), min_value=0, value=item.seats if item.seats is not None and item.seats >= 0 else 500, step=50)
+                            updated_google = col_ug.text_input(_("google_link"), value=item.google_link)
 
-                            updated_probability = col_up.slider(_("probability"), min_value=0, max_value=100, value=item.get('probability', 100), step=5)
+                            updated_probability = col_up.slider(_("probability"), min_value=0, max_value=100, value=item.probability, step=5)
 
-                            updated_note = st.text_area(_("note"), value=item.get('note'))
+                            updated_note = st.text_area(_("note"), value=item.note)
                             
                             if st.form_submit_button(_("update")):
-                                for idx, s in enumerate(tour_schedule):
-                                    if s.get('id') == item_id:
-                                        coords = city_dict.get(updated_city, {'lat': s.get('lat', 0), 'lon': s.get('lon', 0)})
-                                        
-                                        tour_schedule[idx] = {
-                                            "id": item_id,
-                                            "city": updated_city,
-                                            "venue": updated_venue,
-                                            "lat": coords["lat"],
-                                            "lon": coords["lon"],
-                                            "date": updated_date.strftime("%Y-%m-%d"),
-                                            "type": updated_type,
-                                            "seats": str(updated_seats),
-                                            "note": updated_note,
-                                            "google_link": updated_google,
-                                            "probability": updated_probability, 
-                                            "reg_date": s.get('reg_date', datetime.now(timezone('Asia/Kolkata')).strftime("%Y-%m-%d %H:%M:%S"))
-                                        }
-                                        save_json(CITY_FILE, tour_schedule)
-                                        st.session_state[f"edit_mode_{item_id}"] = False
-                                        st.toast(_("schedule_upd_success"), icon='👍')
-                                        safe_rerun()
-                                        break
+                                coords = city_dict.get(updated_city, {'lat': item.lat or 0, 'lon': item.lon or 0})
+                                updated_fields = {
+                                    "city": updated_city,
+                                    "venue": updated_venue,
+                                    "lat": coords["lat"],
+                                    "lon": coords["lon"],
+                                    "date": updated_date.strftime("%Y-%m-%d"),
+                                    "type": updated_type,
+                                    "seats": str(updated_seats),
+                                    "note": updated_note,
+                                    "google_link": updated_google,
+                                    "probability": updated_probability,
+                                }
+                                # reg_date는 기존 값을 유지합니다 (부분 갱신)
+                                if not item.reg_date:
+                                    updated_fields["reg_date"] = datetime.now(timezone('Asia/Kolkata')).strftime("%Y-%m-%d %H:%M:%S")
+                                if update_record(CITY_FILE, item_id, updated_fields):
+                                    st.session_state[f"edit_mode_{item_id}"] = False
+                                    st.toast(_("schedule_upd_success"), icon='👍')
+                                    safe_rerun()
                                 
                     if not st.session_state.get(f"edit_mode_{item_id}"):
-                        st.markdown(f"**{_('date')}:** {item.get('date', 'N/A')} ({item.get('reg_date', '')})")
-                        st.markdown(f"**{_('venue')}:** {item.get('venue', 'N/A')}")
-                        st.markdown(f"**{_('seats')}:** {item.get('seats', 'N/A')}")
+                        st.markdown(f"**{_('date')}:** {item.date_str or 'N/A'} ({item.reg_date})")
+                        st.markdown(f"**{_('venue')}:** {item.venue}")
+                        st.markdown(f"**{_('seats')}:** {item.seats if item.seats is not None else 'N/A'}")
                         st.markdown(f"**{_('type')}:** {translated_type}")
                         st.markdown(f"**{_('probability')}:** {probability_val}%") 
-                        if item.get('google_link'):
-                            google_link_url = item['google_link']
+                        if item.google_link:
+                            google_link_url = item.google_link
                             st.markdown(f"**{_('google_link')}:** [{_('google_link')}]({google_link_url})")
-                        st.markdown(f"**{_('note')}:** {item.get('note', 'N/A')}")
+                        st.markdown(f"**{_('note')}:** {item.note or 'N/A'}")
         else:
             st.info(_("no_schedule"))
 
     # --- 지도 표시 (사용자 & 관리자 공통) ---
+    # 일정 버전/날짜/언어가 같으면 캐시된 HTML을 그대로 사용합니다 (folium 객체 생성 생략)
     current_date = date.today()
-    schedule_for_map = sorted([
-        s for s in tour_schedule 
-        if s.get('date') and s.get('lat') is not None and s.get('lon') is not None and s.get('id')
-    ], key=lambda x: x['date'])
-    
     AURANGABAD_COORDS = city_dict.get("Aurangabad", {'lat': 19.876165, 'lon': 75.343314})
-    start_coords = [AURANGABAD_COORDS['lat'], AURANGABAD_COORDS['lon']]
-    
-    m = folium.Map(location=start_coords, zoom_start=8)
-    locations = []
-    
-    for item in schedule_for_map:
-        lat = item['lat']
-        lon = item['lon']
-        date_str = item['date']
-        
-        try:
-            event_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            event_date = current_date + timedelta(days=365)
-        
-        is_past = event_date < current_date
-        
-        icon_color = '#BB3333'
-        opacity_val = 0.25 if is_past else 1.0
-        
-        type_options_map_rev = {"indoor": _("indoor"), "outdoor": _("outdoor")}
-        translated_type = type_options_map_rev.get(item.get('type', 'outdoor'), _("outdoor"))
-        map_type_icon = '🏠' if item.get('type') == 'indoor' else '🌳'
-        probability_val = item.get('probability', 100)
-        
-        city_name_display = item.get('city', 'N/A')
-        red_city_name = f'<span style="color: #BB3333; font-weight: bold;">{city_name_display}</span>'
-        
-        bar_color = "red" if probability_val < 50 else "gold" if probability_val < 90 else "#66BB66"
-        
-        prob_bar_html = f"""
-        <div style="margin-top: 5px;">
-            <b>{_('probability')}:</b>
-            <div style="width: 100%; height: 10px; background-color: #333; border-radius: 5px; overflow: hidden; margin-top: 3px;">
-                <div style="width: {probability_val}%; height: 100%; background-color: {bar_color};"></div>
-            </div>
-            <span style="font-size: 12px; font-weight: bold; color: {bar_color};">{probability_val}%</span>
-        </div>
-        """
-        
-        popup_html = f"""
-        <div style="color: #FAFAFA; background-color: #1A1A1A; padding: 10px; border-radius: 8px;">
-            <b>{_('city')}:</b> {red_city_name}<br>
-            <b>{_('date')}:</b> {date_str}<br>
-            <b>{_('venue')}:</b> {item.get('venue', 'N/A')}<br>
-            <b>{_('type')}:</b> {map_type_icon} {translated_type}<br>
-            {prob_bar_html}
-        """
-        
-        if item.get('google_link'):
-            google_link_url = item['google_link'] 
-            popup_html += f'<a href="{google_link_url}" target="_blank" style="color: #FFD700; text-decoration: none; display: block; margin-top: 5px;">{_("google_link")}</a>'
-        
-        popup_html += "</div>"
-        
-        city_initial = item.get('city', 'A')[0]
-        marker_icon_html = f"""
-            <div style="
-                transform: scale(0.666); 
-                opacity: {opacity_val};
-                text-align: center;
-                white-space: nowrap;
-            ">
-                <i class="fa fa-map-marker fa-3x" style="color: {icon_color};"></i>
-                <div style="font-size: 10px; color: black; font-weight: bold; position: absolute; top: 12px; left: 13px;">{city_initial}</div>
-            </div>
-        """
-        
-        folium.Marker(
-            [lat, lon],
-            popup=folium.Popup(popup_html, max_width=300),
-            icon=folium.DivIcon(
-                icon_size=(30, 45),
-                icon_anchor=(15, 45),
-                html=marker_icon_html
-            )
-        ).add_to(m)
-        
-        locations.append([lat, lon])
-
-    # 4. AntPath (경로 애니메이션) - 과거/미래 분리 및 스타일 적용
-    if len(locations) > 1:
-        current_index = -1
-        for i, item in enumerate(schedule_for_map):
-            try:
-                event_date = datetime.strptime(item['date'], "%Y-%m-%d").date()
-                if event_date >= current_date:
-                    current_index = i
-                    break
-            except ValueError:
-                continue
-        
-        if current_index == -1: 
-            past_segments = locations
-            future_segments = []
-        elif current_index == 0: 
-            past_segments = []
-            future_segments = locations
-        else: 
-            past_segments = locations[:current_index + 1]
-            future_segments = locations[current_index:]
-
-        # 지난 경로: 25% 투명도의 빨간색 선
-        if len(past_segments) > 1:
-            folium.PolyLine(
-                locations=past_segments,
-                color="#BB3333",
-                weight=5,
-                opacity=0.25, # 25% 투명도
-                tooltip=_("past_route")
-            ).add_to(m)
-            
-        # 미래 경로: AntPath 애니메이션 및 툴팁
-        if len(future_segments) > 1:
-            AntPath(
-                future_segments, 
-                use="regular", 
-                dash_array='30, 20', 
-                color='#BB3333', 
-                weight=5, 
-                opacity=0.8,
-                options={"delay": 24000, "dash_factor": -0.1, "color": "#BB3333"} 
-            ).add_to(m)
-
-            # 세그먼트별 툴팁 (거리/시간)
-            for i in range(len(future_segments) - 1):
-                p1 = future_segments[i]
-                p2 = future_segments[i+1]
-                
-                segment_info = calculate_distance_and_time(p1, p2)
-                
-                folium.PolyLine(
-                    locations=[p1, p2],
-                    color="transparent", 
-                    weight=15, 
-                    opacity=0, 
-                    tooltip=folium.Tooltip(
-                        segment_info, 
-                        permanent=False, 
-                        direction="top", 
-                        sticky=True,
-                        style="background-color: #2D2D2D; color: #FAFAFA; padding: 5px; border-radius: 5px;"
-                    )
-                ).add_to(m)
-            
-        elif locations:
-            try:
-                single_item_date = datetime.strptime(schedule_for_map[0]['date'], "%Y-%m-%d").date()
-                single_is_past = single_item_date < current_date
-            except ValueError:
-                single_is_past = False
-                
-            folium.Circle(
-                location=locations[0],
-                radius=1000,
-                color='#BB3333',
-                fill=True,
-                fill_color='#BB3333',
-                fill_opacity=0.25 if single_is_past else 0.8,
-                tooltip=_("single_location")
-            ).add_to(m)
-
-    # 지도 표시
-    st_folium(m, width=1000, height=600)
+    if not st.session_state.admin and live.enabled() and tour_map.CLIENT_MAP:
+        # 일반 사용자: 허브의 브라우저 지도가 일정 GeoJSON만 받아 직접 그립니다 (변경 시 ETag로 재검증).
+        # 주소가 그대로이므로 재실행되어도 iframe은 다시 로드되지 않습니다.
+        components.iframe(
+            tour_map.client_map_url(
+                live.PUBLIC_HUB_URL, current_date, [AURANGABAD_COORDS['lat'], AURANGABAD_COORDS['lon']], _
+            ),
+            width=1000, height=600
+        )
+    else:
+        travel_model = travel.model(city_dict)
+        map_html = tour_map.render_map_html(
+            schedule_version, current_date, _.locale,
+            lambda: tour_map.build_map(
+                tour_schedule, current_date, _,
+                [AURANGABAD_COORDS['lat'], AURANGABAD_COORDS['lon']], travel_model,
+                segments.table(travel_model)
+            ),
+            extra_key=travel_model.cache_key
+        )
+        components.html(map_html, width=1000, height=600)
 
 
 # --- CSS 적용 (최하단에 위치시켜야 함) ---
-st.markdown(f"""
-<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0/css/all.min.css">
-
-<style>
-/* Snowfall animation setup */
-@keyframes snowfall {{
-    0% {{ background-position: 0% 0%, 0% 0%, 0% 0% }}
-    100% {{ background-position: 500px 1000px, 250px 500px, -100px 300px }}
-}}
-
-/* Dark Christmas Theme Colors */
-:root {{
-    --bg-dark: #1A1A1A; /* Deep Dark */
-    --accent-red: #BB3333; /* Burgundy Red */
-    --accent-gold: #FFD700; /* Gold/Yellow */
-    --text-light: #FAFAFA; /* Light Text */
-    --form-bg: #2D2D2D;
-    --expander-bg: #333333;
-}}
-
-/* Snow effect applied to the root container */
-.stApp {{
-    background-color: var(--bg-dark); 
-    color: var(--text-light); 
-    font-family: Arial, sans-serif;
-    
-    /* Snow effect layer */
-    background-image:
-        url("data:image/svg+xml;utf8,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100' preserveAspectRatio='none'><rect width='100' height='100' fill='none'/><circle cx='5' cy='5' r='1.5' fill='rgba(255, 255, 255, 0.9)'/></svg>"),
-        url("data:image/svg+xml;utf8,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100' preserveAspectRatio='none'><rect width='100' height='100' fill='none'/><circle cx='10' cy='10' r='2' fill='rgba(255, 255, 255, 0.7)'/></svg>"),
-        url("data:image/svg+xml;utf8,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100' preserveAspectRatio='none'><rect width='100' height='100' fill='none'/><circle cx='15' cy='15' r='2.5' fill='rgba(255, 255, 255, 0.5)'/></svg>");
-    
-    /* Snow positioning and size */
-    background-size: 500px 500px, 250px 250px, 150px 150px; 
-    
-    /* Snow animation speed (slower for gentle fall) */
-    animation: snowfall 40s linear infinite; 
-}}
-
-/* Header Styling */
-.main-title {{
-    font-size: 3em;
-    margin-bottom: 0.5em;
-    text-shadow: 0 0 10px rgba(255, 255, 255, 0.2);
-}}
-
-/* 탭 배경색/글꼴색 */
-.stTabs [data-baseweb="tab-list"] button [data-testid="stMarkdownContainer"] p {{
-    color: var(--text-light) !important;
-}}
-
-/* 폼 배경색 */
-.stForm {{
-    padding: 15px;
-    border: 1px solid #444444; /* Darker border */
-    border-radius: 10px;
-    background-color: var(--form-bg);
-}}
-
-/* Expander 배경색 */
-.streamlit-expanderHeader {{
-    background-color: var(--expander-bg);
-    color: var(--text-light);
-    border-radius: 5px;
-    padding: 10px;
-    font-weight: bold;
-    border-bottom: 1px solid var(--accent-red); /* Subtle Red underline */
-}}
-
-/* 버튼 스타일 */
-.stButton>button {{
-    background-color: var(--accent-red); /* Burgundy Red */
-    color: white;
-    border-radius: 8px;
-    border: 1px solid var(--accent-red);
-    padding: 8px 16px;
-    transition: background-color 0.3s, border-color 0.3s;
-    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
-}}
-.stButton>button:hover {{
-    background-color: #CC4444; /* Slightly brighter red */
-    border-color: #FFD700; /* Gold hover effect */
-}}
-
-/* Custom Content Box Style (공지/포스트 내용 박스) */
-.notice-content-box {{
-    border-left: 5px solid var(--accent-gold); /* Gold accent for info box */
-    background-color: rgba(255, 215, 0, 0.05); /* Very subtle light gold background */
-    padding: 10px;
-    border-radius: 5px;
-    margin-top: 10px;
-    margin-bottom: 10px;
-    color: #FAFAFA;
-}}
-
-/* Streamlit Alert 메시지 숨기기 (사용자 요청 반영: 모든 상태 알림 숨김) */
-/* [FIX] 삭제 확인 모달은 보여주기 위해 st.error와 st.warning은 숨기지 않습니다. */
-
-
-/* Selectbox/Input Label Color */
-.stSelectbox>label, .stTextInput>label, .stTextArea>label, .stNumberInput>label {{
-    color: var(--text-light);
-}}
-.stSelectbox div[data-baseweb="select"] {{
-    background-color: #333333;
-}}
-</style>
-""", unsafe_allow_html=True)
+st.markdown(constants.APP_CSS, unsafe_allow_html=True)
@@ -0,0 +1,112 @@
+# bus.py
+"""워커 프로세스 간 무효화 버스.
+
+여러 Streamlit 워커(launch.py)가 같은 cantata.db를 공유할 때, 한 워커의 커밋을 다른 워커에 알려
+일정 인덱스/구간 표 같은 프로세스 공유 구조를 다음 요청 전에 미리 갱신하게 합니다.
+- CANTATA_BUS_URL=redis://... 이고 redis 패키지가 있으면 Redis(호환) pub/sub 채널을 씁니다.
+- 그 밖에는 server.py 허브의 Socket.IO 'refresh' 이벤트를 구독합니다 (live.publish가 이미 보내는 알림).
+버스가 없어도 읽기는 컬렉션 버전 비교로 항상 최신이며, 버스는 첫 요청의 갱신 지연만 없앱니다.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+
+import socketio
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+import live
+import storage
+
+BUS_URL = os.environ.get("CANTATA_BUS_URL", "")
+CHANNEL = "cantata:changes"
+RETRY_SECONDS = 5
+
+# 자기 프로세스가 보낸 메시지를 구분하는 값
+WORKER_ID = uuid.uuid4().hex
+
+_started = None
+_lock = threading.Lock()
+_redis_client = None
+
+
+def _deliver(collection, version):
+    """다른 워커의 변경을 이 프로세스의 캐시와 remote 리스너에 반영합니다."""
+    if collection in storage.COLLECTIONS.values():
+        storage.external_change(collection, version)
+    elif collection is None:
+        # 주제 없는 알림(허브 재접속 직후 등): 놓친 변경이 있을 수 있으므로 모두 확인합니다.
+        storage.invalidate()
+        for name in storage.COLLECTIONS.values():
+            storage.external_change(name, version)
+
+
+# --- Redis pub/sub ---
+def _redis_publish(collection, version):
+    try:
+        _redis_client.publish(CHANNEL, json.dumps({"worker": WORKER_ID, "topic": collection, "version": version}))
+    except redis.RedisError:
+        # 버스가 끊겨도 저장은 그대로입니다 (다른 워커는 다음 요청에서 컬렉션 버전으로 알아챕니다).
+        pass
+
+
+def _redis_loop():
+    while True:
+        try:
+            pubsub = _redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            # 끊겨 있던 동안의 변경 확인
+            _deliver(None, storage.data_version())
+            for message in pubsub.listen():
+                try:
+                    payload = json.loads(message["data"])
+                except (TypeError, ValueError):
+                    continue
+                if payload.get("worker") != WORKER_ID:
+                    _deliver(payload.get("topic"), payload.get("version"))
+        except redis.RedisError:
+            time.sleep(RETRY_SECONDS)
+
+
+# --- 허브(Socket.IO) 구독 ---
+def _hub_loop():
+    client = socketio.Client(reconnection=True, logger=False, engineio_logger=False)
+
+    @client.on("refresh")
+    def on_refresh(data):
+        data = data or {}
+        _deliver(data.get("topic"), data.get("version"))
+
+    while True:
+        try:
+            client.connect(live.HUB_URL, wait_timeout=RETRY_SECONDS)
+            client.wait()
+        except socketio.exceptions.ConnectionError:
+            pass
+        time.sleep(RETRY_SECONDS)
+
+
+def start():
+    """버스 구독을 시작합니다 (프로세스당 한 번). 사용하는 방식 "redis"/"hub"/None을 반환합니다."""
+    global _started, _redis_client
+    with _lock:
+        if _started is not None:
+            return _started or None
+        if BUS_URL.startswith(("redis://", "rediss://", "unix://")) and redis is not None:
+            _redis_client = redis.Redis.from_url(BUS_URL)
+            # 허브 알림(live.publish)과 별개로 이 워커의 커밋을 채널에 보냅니다.
+            storage.add_listener(_redis_publish)
+            target, _started = _redis_loop, "redis"
+        elif live.enabled():
+            # 이 워커의 커밋은 live.publish가 허브로 보내고, 허브가 모든 워커에 다시 알립니다.
+            target, _started = _hub_loop, "hub"
+        else:
+            _started = ""
+            return None
+        threading.Thread(target=target, name=f"bus-{_started}", daemon=True).start()
+        return _started
@@ -0,0 +1,211 @@
+# geo.py
+"""거리/이동 시간 계산 (NumPy 일괄 계산). 도시 표의 거리 행렬은 프로세스당 한 번만 만듭니다."""
+from functools import lru_cache
+from math import radians, cos, sin, asin, sqrt
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+# 예상 이동 속도: 500 km 미만은 60 km/h, 그 이상은 80 km/h
+SHORT_TRIP_KM = 500
+SHORT_TRIP_KMH = 60
+LONG_TRIP_KMH = 80
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """두 위도/경도 쌍 사이의 지구 표면 거리를 km 단위로 계산합니다 (Haversine 공식)."""
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+
+    a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
+    c = 2 * asin(sqrt(a))
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_matrix(lats1, lons1, lats2=None, lons2=None):
+    """모든 점 쌍의 거리(km) 행렬. 두 번째 점 목록을 생략하면 첫 목록끼리의 정방 행렬입니다."""
+    lat1 = np.radians(np.asarray(lats1, dtype=float))[:, None]
+    lon1 = np.radians(np.asarray(lons1, dtype=float))[:, None]
+    if lats2 is None:
+        lat2, lon2 = lat1.T, lon1.T
+    else:
+        lat2 = np.radians(np.asarray(lats2, dtype=float))[None, :]
+        lon2 = np.radians(np.asarray(lons2, dtype=float))[None, :]
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def leg_distances(lats, lons):
+    """연속한 정류지 사이 구간 거리(km) 배열 (길이 n-1)."""
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    a = (np.sin(np.diff(lat) / 2) ** 2
+         + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def travel_hours(distance_km):
+    """거리(km, 스칼라 또는 배열)에 대한 예상 이동 시간(시간)."""
+    distance_km = np.asarray(distance_km, dtype=float)
+    speed = np.where(distance_km < SHORT_TRIP_KM, SHORT_TRIP_KMH, LONG_TRIP_KMH)
+    return distance_km / speed
+
+
+def format_leg(distance_km, travel_time_h):
+    """구간 툴팁 문자열: '거리: 12.3 km | 예상 시간: 1시간 5분'."""
+    hours = int(travel_time_h)
+    minutes = int((travel_time_h - hours) * 60)
+
+    if hours > 0:
+        time_str = f"{hours}시간 {minutes}분"
+    else:
+        time_str = f"{minutes}분"
+
+    return f"거리: {distance_km:.1f} km | 예상 시간: {time_str}"
+
+
+def calculate_distance_and_time(p1, p2):
+    """두 좌표 사이의 거리와 예상 소요 시간을 문자열로 반환합니다."""
+    distance_km = haversine(p1[0], p1[1], p2[0], p2[1])
+    return format_leg(distance_km, float(travel_hours(distance_km)))
+
+
+class CityMatrix:
+    """도시 표 전체의 거리/이동 시간 행렬."""
+
+    def __init__(self, names, lats, lons):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.km = haversine_matrix(self.lats, self.lons)
+        self.hours = travel_hours(self.km)
+
+    def distance(self, city1, city2):
+        return float(self.km[self.index[city1], self.index[city2]])
+
+    def hours_between(self, city1, city2):
+        return float(self.hours[self.index[city1], self.index[city2]])
+
+    def submatrix(self, cities):
+        """주어진 도시 목록 순서대로 뽑은 거리 행렬."""
+        idx = [self.index[c] for c in cities]
+        return self.km[np.ix_(idx, idx)]
+
+
+@lru_cache(maxsize=4)
+def _city_matrix(key):
+    names = [k[0] for k in key]
+    return CityMatrix(names, [k[1] for k in key], [k[2] for k in key])
+
+
+def city_matrix(city_dict):
+    """city_dict({이름: {"lat", "lon"}})의 거리 행렬. 같은 도시 표면 캐시된 행렬을 반환합니다."""
+    key = tuple((name, c["lat"], c["lon"]) for name, c in city_dict.items())
+    return _city_matrix(key)
+
+
+# --- 공간 인덱스 (KD-트리) ---
+def _unit_vectors(lats, lons):
+    """위도/경도를 단위 구 위의 3차원 좌표로 바꿉니다. 이 공간의 직선(현) 거리는 대원 거리와 순서가 같습니다."""
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0.0, 1.0))
+
+
+def _km_to_chord(distance_km):
+    return 2 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+class _KDNode:
+    __slots__ = ("index", "axis", "left", "right")
+
+    def __init__(self, index, axis, left, right):
+        self.index = index
+        self.axis = axis
+        self.left = left
+        self.right = right
+
+
+class CityIndex:
+    """도시 좌표 KD-트리: 최근접 도시, 반경 내 도시, k개 후보 조회."""
+
+    def __init__(self, names, lats, lons):
+        self.names = list(names)
+        self.points = _unit_vectors(lats, lons)
+        self._coords = self.points.tolist()
+        self.root = self._build(list(range(len(self.names))), 0)
+
+    def _build(self, indices, depth):
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: self._coords[i][axis])
+        mid = len(indices) // 2
+        return _KDNode(
+            indices[mid], axis,
+            self._build(indices[:mid], depth + 1),
+            self._build(indices[mid + 1:], depth + 1),
+        )
+
+    def _search(self, target, k, radius_sq):
+        """후보 (거리², 번호) 목록. k개 또는 반경 이내만 유지합니다."""
+        best = []  # 거리² 오름차순
+        coords = self._coords
+
+        def visit(node):
+            if node is None:
+                return
+            p = coords[node.index]
+            dist_sq = (p[0] - target[0]) ** 2 + (p[1] - target[1]) ** 2 + (p[2] - target[2]) ** 2
+            limit = radius_sq if k is None else (best[-1][0] if len(best) >= k else radius_sq)
+            if dist_sq <= limit:
+                best.append((dist_sq, node.index))
+                best.sort()
+                if k is not None and len(best) > k:
+                    best.pop()
+            diff = target[node.axis] - p[node.axis]
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            visit(near)
+            limit = radius_sq if k is None else (best[-1][0] if len(best) >= k else radius_sq)
+            if diff * diff <= limit:
+                visit(far)
+
+        visit(self.root)
+        return best
+
+    def _results(self, found):
+        chords = np.sqrt([dist_sq for dist_sq, _i in found])
+        return [(self.names[i], float(km)) for (_d, i), km in zip(found, _chord_to_km(chords))]
+
+    def nearest(self, lat, lon, k=1, exclude=()):
+        """좌표에서 가장 가까운 도시 k개 [(이름, km)]. exclude에 든 도시는 건너뜁니다."""
+        target = _unit_vectors([lat], [lon])[0].tolist()
+        found = self._search(target, k + len(exclude), 4.0)
+        results = [r for r in self._results(found) if r[0] not in exclude]
+        return results[:k]
+
+    def within(self, lat, lon, radius_km):
+        """좌표에서 radius_km 이내의 도시 [(이름, km)] (가까운 순)."""
+        target = _unit_vectors([lat], [lon])[0].tolist()
+        chord = _km_to_chord(radius_km)
+        return self._results(self._search(target, None, chord * chord))
+
+
+@lru_cache(maxsize=4)
+def _city_index(key):
+    return CityIndex([k[0] for k in key], [k[1] for k in key], [k[2] for k in key])
+
+
+def city_index(city_dict):
+    """city_dict의 공간 인덱스. 같은 도시 표면 프로세스당 한 번만 만듭니다."""
+    key = tuple((name, c["lat"], c["lon"]) for name, c in city_dict.items())
+    return _city_index(key)
@@ -0,0 +1,191 @@
+# hub_loadtest.py
+"""server.py 허브 부하 테스트: 유휴 Socket.IO 연결을 많이 열어 두고 알림 전달을 확인합니다.
+
+    python server.py &
+    python hub_loadtest.py --clients 10000 --url http://localhost:5000
+
+연결마다 Engine.IO v4 웹소켓을 직접 열고(eventlet 그린 소켓과 그린 스레드 하나씩) ping에만 응답합니다.
+모두 연결되면 /trigger_refresh로 일정 변경을 몇 번 연달아 알리고, 묶인 알림이 각 클라이언트에 몇 번,
+얼마 만에 도착했는지와 허브의 /stats를 출력합니다. 허브에 CANTATA_HUB_SECRET이 있으면 같은 값을 환경 변수로 넘깁니다. 허브와 이 스크립트 모두 `ulimit -n`이 연결 수보다 커야 합니다.
+"""
+import eventlet
+
+eventlet.monkey_patch()
+
+import argparse
+import base64
+import json
+import os
+import resource
+import socket
+import struct
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+
+class Stats:
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.events = 0
+        self.receivers = set()
+        self.first_event = None
+        self.last_event = None
+
+
+def _raise_fd_limit(wanted):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < wanted:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+        except (ValueError, OSError):
+            pass
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+class WebSocket:
+    """텍스트 프레임만 주고받는 최소 웹소켓 클라이언트 (연결당 소켓 하나, 추가 스레드 없음)."""
+
+    def __init__(self, url, timeout=10):
+        parts = urlsplit(url)
+        self.sock = socket.create_connection((parts.hostname, parts.port or 80), timeout=timeout)
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        self.sock.sendall((
+            f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode())
+        self.buffer = b""
+        while b"\r\n\r\n" not in self.buffer:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("handshake closed")
+            self.buffer += chunk
+        head, self.buffer = self.buffer.split(b"\r\n\r\n", 1)
+        if b" 101 " not in head.split(b"\r\n", 1)[0]:
+            raise ConnectionError(head.split(b"\r\n", 1)[0].decode(errors="replace"))
+
+    def _read(self, n):
+        while len(self.buffer) < n:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("closed")
+            self.buffer += chunk
+        data, self.buffer = self.buffer[:n], self.buffer[n:]
+        return data
+
+    def receive(self, timeout=None):
+        """다음 텍스트 메시지. timeout 안에 없으면 None."""
+        self.sock.settimeout(timeout)
+        try:
+            first, second = self._read(2)
+        except socket.timeout:
+            return None
+        self.sock.settimeout(None)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self._read(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self._read(8))[0]
+        payload = self._read(length)
+        if first & 0x0F == 0x8:
+            raise ConnectionError("closed by server")
+        return payload.decode()
+
+    def send(self, text):
+        # 클라이언트 프레임은 마스킹해야 합니다.
+        data = text.encode()
+        mask = os.urandom(4)
+        header = bytes([0x81, 0x80 | len(data)]) if len(data) < 126 else bytes([0x81, 0xFE]) + struct.pack("!H", len(data))
+        self.sock.sendall(header + mask + bytes(b ^ mask[i % 4] for i, b in enumerate(data)))
+
+    def close(self):
+        self.sock.close()
+
+
+def _connect(ws_url):
+    try:
+        ws = WebSocket(ws_url)
+        ws.receive(timeout=10)  # Engine.IO open 패킷
+        ws.send("40")  # 기본 네임스페이스 접속
+        return ws
+    except Exception:
+        return None
+
+
+def _listen(n, ws, stats):
+    """연결이 닫힐 때까지 메시지를 받습니다 (타임아웃 없이 대기하므로 유휴 연결은 CPU를 쓰지 않습니다)."""
+    try:
+        while True:
+            message = ws.receive()
+            if message == "2":  # ping
+                ws.send("3")
+            elif message.startswith('42["refresh"'):
+                data = json.loads(message[2:])[1]
+                if data.get("topic") == "schedule":
+                    stats.events += 1
+                    stats.receivers.add(n)
+                    now = time.monotonic()
+                    stats.first_event = stats.first_event or now
+                    stats.last_event = now
+    except Exception:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="허브 유휴 연결/알림 부하 테스트")
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=200, help="동시에 진행하는 연결 수립 수")
+    parser.add_argument("--burst", type=int, default=20, help="연달아 보내는 변경 알림 수")
+    parser.add_argument("--hold", type=float, default=15.0, help="알림 후 유지 시간(초)")
+    args = parser.parse_args()
+
+    limit = _raise_fd_limit(args.clients + 256)
+    if limit < args.clients + 64:
+        print(f"경고: 열 수 있는 파일 수({limit})가 연결 수보다 작습니다.")
+
+    base = args.url.rstrip("/")
+    secret = os.environ.get("CANTATA_HUB_SECRET", "")
+    headers = {"X-Cantata-Secret": secret} if secret else None
+    ws_url = base.replace("http", "ws", 1) + "/socket.io/?EIO=4&transport=websocket&topics=schedule"
+    stats = Stats()
+    sockets = []
+    connector = eventlet.GreenPool(args.concurrency)
+
+    started = time.monotonic()
+    for n, ws in enumerate(connector.imap(_connect, [ws_url] * args.clients)):
+        if ws is None:
+            stats.failed += 1
+            continue
+        stats.connected += 1
+        sockets.append(ws)
+        eventlet.spawn_n(_listen, n, ws, stats)
+    connect_seconds = time.monotonic() - started
+    print(f"연결: {stats.connected}/{args.clients} (실패 {stats.failed}), {connect_seconds:.1f}초")
+
+    # 유휴 상태 유지 (ping/pong만 오감)
+    eventlet.sleep(5)
+    print("허브:", requests.get(f"{base}/stats", headers=headers, timeout=30).json())
+
+    sent = time.monotonic()
+    for _ in range(args.burst):
+        requests.post(f"{base}/trigger_refresh", json={"topic": "schedule"}, headers=headers, timeout=30)
+    eventlet.sleep(args.hold)
+
+    if stats.first_event:
+        print(
+            f"알림: {args.burst}번 변경 -> {stats.events}건 전달, 받은 클라이언트 {len(stats.receivers)}/{stats.connected}, "
+            f"첫 도착 {stats.first_event - sent:.2f}초, 마지막 도착 {stats.last_event - sent:.2f}초"
+        )
+    else:
+        print("알림: 도착한 알림이 없습니다.")
+    print("허브:", requests.get(f"{base}/stats", headers=headers, timeout=30).json())
+    for ws in sockets:
+        ws.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# i18n.py
+"""다국어 문구: locales/<언어>.json 카탈로그와 언어별 번역기.
+
+카탈로그는 그 언어를 처음 쓰는 세션이 요청할 때 한 번만 읽고, 번역기는 같은 언어의 모든 세션이 공유합니다.
+언어를 추가하려면 locales/<코드>.json을 만들고 locales/languages.json에 이름을 넣으면 됩니다.
+"""
+import json
+import os
+from functools import lru_cache
+
+LOCALE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+DEFAULT_LOCALE = "ko"
+
+
+class Translator:
+    """_("key") 형태로 호출하는 번역기. 자주 쓰는 선택지 표시 이름은 미리 만들어 둡니다."""
+
+    __slots__ = ("locale", "catalog", "schedule_types", "schedule_type_keys", "notice_types", "notice_type_keys")
+
+    def __init__(self, locale, catalog):
+        self.locale = locale
+        self.catalog = catalog
+        # 내부 키 -> 표시 이름, 표시 이름 -> 내부 키
+        self.schedule_types = {"indoor": self("indoor"), "outdoor": self("outdoor")}
+        self.schedule_type_keys = {label: key for key, label in self.schedule_types.items()}
+        self.notice_types = {"General": self("general"), "Urgent": self("urgent")}
+        self.notice_type_keys = {label: key for key, label in self.notice_types.items()}
+
+    def __call__(self, key):
+        return self.catalog.get(key, key)
+
+    def get(self, key, default):
+        return self.catalog.get(key, default)
+
+
+@lru_cache(maxsize=1)
+def languages():
+    """사용 가능한 언어 {코드: 표시 이름} (선택 목록 순서)."""
+    with open(os.path.join(LOCALE_DIR, "languages.json"), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _load_catalog(locale):
+    try:
+        with open(os.path.join(LOCALE_DIR, f"{locale}.json"), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+@lru_cache(maxsize=None)
+def translator(locale):
+    """언어 코드의 번역기 (프로세스당 언어별로 하나). 모르는 코드는 기본 언어를 씁니다."""
+    if locale not in languages():
+        locale = DEFAULT_LOCALE
+    return Translator(locale, _load_catalog(locale))
@@ -0,0 +1,60 @@
+# launch.py
+"""허브(server.py)와 Streamlit 워커 N개를 함께 실행합니다.
+
+    python launch.py --workers 4 --base-port 8501
+
+워커는 같은 cantata.db(SQLite WAL)를 공유하고, 변경 알림은 허브(또는 CANTATA_BUS_URL의 Redis)로 주고받습니다.
+Streamlit 세션은 워커 메모리에 있으므로 앞단 로드밸런서는 세션 고정이 필요합니다 (deploy/nginx.conf.example).
+워커는 http://localhost:5000으로 허브에 알리고, 브라우저용 허브 주소는 CANTATA_PUBLIC_HUB_URL로 지정합니다
+(지정하지 않으면 같은 컴퓨터의 브라우저만 허브에 닿고, 나머지는 주기적 새로고침을 씁니다).
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="칸타타 투어 앱 워커 실행기")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("CANTATA_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--base-port", type=int, default=8501)
+    parser.add_argument("--no-hub", action="store_true", help="허브를 따로 실행하는 경우")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("CANTATA_HUB_URL", "http://localhost:5000")
+
+    processes = []
+    if not args.no_hub:
+        processes.append(subprocess.Popen([sys.executable, "server.py"], cwd=ROOT, env=env))
+    for i in range(args.workers):
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", "app.py",
+             "--server.port", str(args.base_port + i), "--server.headless", "true"],
+            cwd=ROOT, env=env,
+        ))
+
+    try:
+        # 하나라도 죽으면 전체를 내립니다 (프로세스 관리자가 다시 띄우도록).
+        while all(p.poll() is None for p in processes):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in processes:
+            if p.poll() is None:
+                p.send_signal(signal.SIGTERM)
+        for p in processes:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+    return max((p.returncode or 0) for p in processes)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# live.py
+"""데이터 변경 알림 채널: 저장 시 server.py 허브에 버전을 알리고, 브라우저는 버전이 바뀔 때만 재실행합니다."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit.components.v1 as components
+
+import storage
+
+# server.py (Flask-SocketIO) 주소 (앱 서버가 알림을 보낼 때 사용). 비워 두면(기본) 실시간 채널을 끄고 주기적 새로고침을 사용합니다.
+HUB_URL = os.environ.get("CANTATA_HUB_URL", "").rstrip("/")
+# 브라우저가 접속할 허브 주소. 앱 서버에서 보이는 주소(예: localhost)와 다를 때 지정합니다.
+PUBLIC_HUB_URL = os.environ.get("CANTATA_PUBLIC_HUB_URL", HUB_URL).rstrip("/")
+# 허브 /trigger_refresh의 공유 비밀 (server.py와 같은 값). 비워 두면 허브는 로컬 호출만 받습니다.
+HUB_SECRET = os.environ.get("CANTATA_HUB_SECRET", "")
+# 브라우저가 허브에 닿지 않을 때 쓰는 주기적 새로고침 간격 (ms)
+FALLBACK_INTERVAL_MS = 10000
+
+# 허브가 꺼져 있어도 저장이 느려지지 않도록 알림은 백그라운드에서 보냅니다.
+_publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-publish")
+
+_live_updates = components.declare_component(
+    "live_updates",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "live_component"),
+)
+
+
+def enabled():
+    return bool(HUB_URL)
+
+
+def _post_version(collection, version):
+    # 버전은 허브가 저장소에서 직접 읽습니다. 여기서는 바뀐 주제만 알립니다.
+    try:
+        requests.post(
+            f"{HUB_URL}/trigger_refresh",
+            json={"topic": collection},
+            headers={"X-Cantata-Secret": HUB_SECRET} if HUB_SECRET else None,
+            timeout=2,
+        )
+    except requests.RequestException:
+        # 허브가 없으면 알림만 생략합니다.
+        pass
+
+
+def publish(collection, version):
+    """storage 커밋 후 호출됩니다: 새 데이터 버전을 허브로 보냅니다."""
+    if enabled():
+        _publisher.submit(_post_version, collection, version)
+
+
+def watch(version, key="live_updates"):
+    """현재 화면이 보여 주는 데이터 버전을 허브와 비교하는 보이지 않는 컴포넌트.
+
+    허브가 더 새로운 버전을 알리면 그 값을 반환하면서 이 세션만 재실행됩니다.
+    브라우저가 허브에 접속하지 못하면 FALLBACK_INTERVAL_MS마다 재실행합니다 (st_autorefresh와 같은 동작).
+    """
+    return _live_updates(
+        hub_url=PUBLIC_HUB_URL, version=version, fallback_interval=FALLBACK_INTERVAL_MS,
+        key=key, default=version,
+    )
+
+
+storage.add_listener(publish)
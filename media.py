@@ -0,0 +1,260 @@
+# media.py
+"""업로드 파일 저장(해시 주소 저장소, 사진 축소본)과 미디어 URL.
+
+허브 주소가 설정되어 있으면 파일 전송은 server.py의 /media 엔드포인트가 담당하고,
+아니면 앱이 Streamlit(st.image/st.video/st.download_button)으로 직접 보여 줍니다.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import storage
+
+try:
+    from PIL import Image, ImageFilter, ImageOps
+except ImportError:
+    # Pillow가 없으면 축소본 없이 원본만 제공합니다.
+    Image = None
+
+# IMPORTANT: Streamlit runs from the root of the project, so UPLOAD_DIR is created there.
+UPLOAD_DIR = os.environ.get("CANTATA_UPLOAD_DIR", "uploads")
+
+# 업로드 제한 및 복사 단위
+CHUNK_SIZE = 1024 * 1024
+MAX_FILE_BYTES = int(os.environ.get("CANTATA_MAX_FILE_MB", "200")) * 1024 * 1024
+MAX_REQUEST_BYTES = int(os.environ.get("CANTATA_MAX_REQUEST_MB", "500")) * 1024 * 1024
+
+# 사진 축소본 (이름 -> 긴 변 픽셀). 목록에는 thumb, 휴대폰 화면에는 mobile을 사용합니다.
+IMAGE_VARIANTS = {"thumb": 320, "mobile": 960, "full": 2048}
+PLACEHOLDER_SIZE = 24
+VARIANT_DIR = os.path.join(UPLOAD_DIR, "variants")
+
+# 해시 주소 첨부파일 저장소: 같은 내용은 한 번만 저장하고 참조 수로 관리합니다.
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
+
+# 업로드 요청이 리사이즈를 기다리지 않도록 축소본은 백그라운드에서 만듭니다.
+_image_workers = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-variants")
+
+# 업로드 파일을 내려주는 (브라우저에서 닿는) 주소. CANTATA_MEDIA_URL이 없으면 허브 주소의 /media이고,
+# 둘 다 없으면(기본) 비워 두어 앱이 파일을 직접 보여 줍니다.
+_HUB_URL = os.environ.get("CANTATA_PUBLIC_HUB_URL") or os.environ.get("CANTATA_HUB_URL", "")
+MEDIA_URL = os.environ.get(
+    "CANTATA_MEDIA_URL", f"{_HUB_URL.rstrip('/')}/media" if _HUB_URL else ""
+).rstrip("/")
+
+
+class UploadError(Exception):
+    """업로드 파일을 저장하지 못했을 때 (사용자에게 보여 줄 메시지를 담습니다)."""
+
+
+def media_path(file_path):
+    """UPLOAD_DIR 기준 상대 경로 (URL에 쓰임)."""
+    return os.path.relpath(file_path, UPLOAD_DIR).replace(os.sep, "/")
+
+
+def served():
+    """파일을 허브 /media URL로 내려주는지 (아니면 Streamlit으로 직접 표시)."""
+    return bool(MEDIA_URL)
+
+
+def media_url(file_path, download_name=None):
+    """업로드 파일의 HTTP URL. download_name을 주면 첨부파일로 내려받습니다."""
+    url = f"{MEDIA_URL}/{quote(media_path(file_path))}"
+    if download_name:
+        url += f"?download={quote(download_name)}"
+    return url
+
+
+# --- 사진 축소본 ---
+def variant_paths(file_path):
+    """원본 경로에 대응하는 축소본/블러 미리보기 경로 {이름: 경로}."""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    paths = {name: os.path.join(VARIANT_DIR, f"{stem}_{name}.jpg") for name in IMAGE_VARIANTS}
+    paths["placeholder"] = os.path.join(VARIANT_DIR, f"{stem}_placeholder.jpg")
+    return paths
+
+
+def _save_jpeg(image, path):
+    tmp_path = f"{path}.tmp"
+    image.save(tmp_path, "JPEG", quality=82, optimize=True, progressive=True)
+    os.replace(tmp_path, path)
+
+
+def _make_variants(file_path, paths):
+    try:
+        with Image.open(file_path) as source:
+            image = ImageOps.exif_transpose(source).convert("RGB")
+        for name, max_side in IMAGE_VARIANTS.items():
+            variant = image.copy()
+            variant.thumbnail((max_side, max_side))
+            _save_jpeg(variant, paths[name])
+        placeholder = image.copy()
+        placeholder.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+        _save_jpeg(placeholder.filter(ImageFilter.GaussianBlur(2)), paths["placeholder"])
+    except (OSError, ValueError):
+        # 읽을 수 없는 이미지는 원본만 제공합니다.
+        pass
+
+
+def schedule_variants(file_info):
+    """사진이면 축소본 경로를 file_info에 기록하고 생성 작업을 백그라운드 풀에 넣습니다."""
+    if Image is None or not file_info.get("type", "").startswith("image/"):
+        return file_info
+    paths = variant_paths(file_info["path"])
+    os.makedirs(VARIANT_DIR, exist_ok=True)
+    file_info["variants"] = {name: paths[name] for name in IMAGE_VARIANTS}
+    file_info["placeholder"] = paths["placeholder"]
+    # 같은 사진이 이미 올라와 있으면 (같은 blob) 축소본도 이미 있습니다.
+    if not all(os.path.exists(path) for path in paths.values()):
+        _image_workers.submit(_make_variants, file_info["path"], paths)
+    return file_info
+
+
+def variant_path(file_info, name):
+    """축소본이 준비되었으면 그 경로, 아직 없으면 원본 경로."""
+    path = file_info.get("variants", {}).get(name)
+    if path and os.path.exists(path):
+        return path
+    return file_info["path"]
+
+
+def variant_url(file_info, name):
+    """축소본이 준비되었으면 그 URL, 아직 없으면 원본 URL."""
+    return media_url(variant_path(file_info, name))
+
+
+def placeholder_url(file_info):
+    path = file_info.get("placeholder")
+    if path and os.path.exists(path):
+        return media_url(path)
+    return None
+
+
+def file_paths(file_info):
+    """첨부파일의 원본/축소본/미리보기 경로 목록."""
+    paths = [file_info.get("path")] + list(file_info.get("variants", {}).values()) + [file_info.get("placeholder")]
+    return [path for path in paths if path]
+
+
+def _remove_paths(file_info):
+    """원본과 축소본을 모두 삭제합니다."""
+    for path in file_paths(file_info):
+        if os.path.exists(path):
+            _discard(path)
+
+
+def release_file(file_info):
+    """공지/포스트가 첨부파일을 더 이상 쓰지 않을 때 호출합니다.
+
+    해시 저장소의 파일은 참조 수만 줄이고, 마지막 참조가 사라질 때만 삭제합니다.
+    (blob 키가 없는 예전 업로드 파일은 바로 삭제합니다)
+    """
+    blob = file_info.get("blob")
+    if not blob:
+        _remove_paths(file_info)
+        return
+    try:
+        storage.release_blob_ref(blob, lambda: _remove_paths(file_info))
+    except sqlite3.Error:
+        pass
+
+
+# --- 업로드 저장 ---
+def save_upload(uploaded_file, max_bytes=MAX_FILE_BYTES):
+    """업로드 파일을 고정 크기 조각으로 복사하며 SHA-256을 계산해 해시 저장소에 넣습니다.
+
+    임시 파일에 쓴 뒤 이름을 바꾸므로 중간에 실패해도 반쪽짜리 파일이 남지 않고,
+    같은 내용이 이미 있으면 새로 저장하지 않고 참조 수만 늘립니다.
+    """
+    name = os.path.basename(uploaded_file.name)
+    declared_size = getattr(uploaded_file, "size", None)
+    if declared_size is not None and declared_size > max_bytes:
+        raise UploadError(f"{name}: 파일이 너무 큽니다 (최대 {max_bytes // (1024 * 1024)} MB).")
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    written = 0
+
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            uploaded_file.seek(0)
+            while True:
+                chunk = uploaded_file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadError(f"{name}: 파일이 너무 큽니다 (최대 {max_bytes // (1024 * 1024)} MB).")
+                digest.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        sha256 = digest.hexdigest()
+        blob = blob_key(sha256, name)
+        file_path = os.path.join(UPLOAD_DIR, blob)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        storage.add_blob_ref(blob, lambda: _place_blob(tmp_path, file_path))
+    except sqlite3.Error as e:
+        _discard(tmp_path)
+        raise UploadError(f"{name}: 저장 실패 ({e})") from e
+    except OSError as e:
+        _discard(tmp_path)
+        raise UploadError(f"{name}: 저장 실패 ({e.strerror or e})") from e
+    except BaseException:
+        _discard(tmp_path)
+        raise
+
+    return {
+        "name": name,
+        "path": file_path,
+        "type": uploaded_file.type,
+        "size": written,
+        "sha256": sha256,
+        "blob": blob,
+    }
+
+
+def blob_key(sha256, name):
+    """해시 저장소 안의 상대 경로 (확장자는 MIME 판별용으로 유지)."""
+    ext = os.path.splitext(name)[1].lower()
+    return f"blobs/{sha256[:2]}/{sha256}{ext}"
+
+
+def _place_blob(tmp_path, file_path):
+    """같은 내용이 이미 있으면 새 파일을 버리고, 없으면 제자리로 옮깁니다."""
+    if os.path.exists(file_path):
+        _discard(tmp_path)
+    else:
+        os.replace(tmp_path, file_path)
+
+
+def save_uploads(uploaded_files, max_request_bytes=MAX_REQUEST_BYTES):
+    """여러 파일을 저장하고 (파일 정보 목록, 오류 메시지 목록)을 반환합니다."""
+    file_info_list = []
+    errors = []
+    remaining = max_request_bytes
+    for uploaded_file in uploaded_files or []:
+        declared_size = getattr(uploaded_file, "size", 0) or 0
+        if MAX_FILE_BYTES >= declared_size > remaining:
+            errors.append(f"{os.path.basename(uploaded_file.name)}: 한 번에 올릴 수 있는 용량을 넘었습니다 "
+                          f"(최대 {max_request_bytes // (1024 * 1024)} MB).")
+            continue
+        try:
+            file_info = save_upload(uploaded_file, max_bytes=min(MAX_FILE_BYTES, remaining))
+        except UploadError as e:
+            errors.append(str(e))
+            continue
+        remaining -= file_info["size"]
+        file_info_list.append(file_info)
+    return file_info_list, errors
+
+
+def _discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,243 @@
+# models.py
+"""공지사항/투어 일정/사용자 포스트의 타입이 정해진 읽기 전용 모델.
+
+저장소의 레코드(dict)를 읽을 때 한 번만 변환합니다. 날짜는 date/datetime, 인원/가능성은 int로 바뀌고
+형식이 틀린 레코드는 여기서 걸러지므로, 화면 코드는 검증 없이 속성을 바로 읽습니다.
+"""
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+
+import storage
+
+SCHEDULE_COLLECTION = "schedule"
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_datetime(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True, frozen=True)
+class ScheduleEntry:
+    id: str
+    city: str
+    venue: str
+    date: date | None  # 형식이 틀린 날짜는 None
+    date_str: str  # 저장된 "YYYY-MM-DD" 문자열 (정렬/중복 검사용)
+    lat: float | None
+    lon: float | None
+    type: str  # "indoor" 또는 "outdoor"
+    seats: int | None
+    probability: int
+    note: str
+    google_link: str
+    reg_date: str
+
+    @classmethod
+    def from_record(cls, record):
+        """id와 도시가 있는 레코드만 변환합니다. 아니면 None."""
+        if not isinstance(record, dict) or not record.get('id') or not record.get('city'):
+            return None
+        date_str = record.get('date') or ''
+        return cls(
+            id=record['id'],
+            city=record['city'],
+            venue=record.get('venue') or '',
+            date=_parse_date(date_str),
+            date_str=date_str,
+            lat=_to_float(record.get('lat')),
+            lon=_to_float(record.get('lon')),
+            type='indoor' if record.get('type') == 'indoor' else 'outdoor',
+            seats=_to_int(record.get('seats'), None),
+            probability=_to_int(record.get('probability', 100), 100),
+            note=record.get('note') or '',
+            google_link=record.get('google_link') or '',
+            reg_date=record.get('reg_date') or '',
+        )
+
+    @property
+    def key(self):
+        """중복 검사 키 (도시, 날짜 문자열)."""
+        return (self.city, self.date_str)
+
+    @property
+    def has_location(self):
+        return self.lat is not None and self.lon is not None
+
+
+@dataclass(slots=True, frozen=True)
+class Notice:
+    id: str | None
+    title: str
+    content: str
+    type: str  # "General" 또는 "Urgent"
+    files: tuple  # media.save_upload가 돌려준 파일 정보 dict들
+    date_str: str  # "YYYY-MM-DD HH:MM:SS" (표시용)
+    posted: datetime | None
+
+    @classmethod
+    def from_record(cls, record):
+        """제목이 있는 레코드만 변환합니다. 아니면 None."""
+        if not isinstance(record, dict) or not record.get('title'):
+            return None
+        return cls(
+            id=record.get('id'),
+            title=record['title'],
+            content=record.get('content') or '',
+            type='Urgent' if record.get('type') == 'Urgent' else 'General',
+            files=tuple(record.get('files') or ()),
+            date_str=record.get('date') or 'N/A',
+            posted=_parse_datetime(record.get('date')),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class Post:
+    id: str | None
+    content: str
+    files: tuple
+    date_str: str
+    posted: datetime | None
+
+    @classmethod
+    def from_record(cls, record):
+        """내용이나 첨부파일이 있는 레코드만 변환합니다. 아니면 None."""
+        if not isinstance(record, dict) or not (record.get('content') or record.get('files')):
+            return None
+        return cls(
+            id=record.get('id'),
+            content=record.get('content') or '',
+            files=tuple(record.get('files') or ()),
+            date_str=record.get('date') or 'N/A',
+            posted=_parse_datetime(record.get('date')),
+        )
+
+
+def parse(model, records):
+    """레코드 목록을 model 목록으로 한 번에 변환합니다 (변환할 수 없는 레코드는 제외)."""
+    return [item for item in map(model.from_record, records) if item is not None]
+
+
+class ScheduleIndex:
+    """투어 일정의 id 인덱스와 (도시, 날짜) 인덱스. 저장소 저널의 변경분만 반영해 갱신합니다."""
+
+    def __init__(self, version, entries):
+        self.version = version
+        self.by_id = {}
+        # (도시, 날짜) -> id 집합 (예전 데이터에는 중복이 있을 수 있습니다)
+        self.by_key = {}
+        for entry in entries:
+            self._add(entry)
+
+    def _add(self, entry):
+        self.by_id[entry.id] = entry
+        self.by_key.setdefault(entry.key, set()).add(entry.id)
+
+    def _remove(self, record_id):
+        entry = self.by_id.pop(record_id, None)
+        if entry is None:
+            return
+        ids = self.by_key.get(entry.key)
+        if ids is not None:
+            ids.discard(record_id)
+            if not ids:
+                del self.by_key[entry.key]
+
+    def apply(self, changes, version, fetch):
+        """저널 변경분 [(seq, record_id, op)]을 반영합니다. fetch(record_id)는 현재 레코드를 돌려줍니다."""
+        for record_id in dict.fromkeys(record_id for _seq, record_id, _op in changes):
+            self._remove(record_id)
+            entry = ScheduleEntry.from_record(fetch(record_id))
+            if entry is not None:
+                self._add(entry)
+        self.version = version
+
+    def get(self, record_id):
+        return self.by_id.get(record_id)
+
+    def has(self, city, date_str):
+        """같은 도시/날짜 일정이 이미 있는지."""
+        return (city, date_str) in self.by_key
+
+    def keys(self):
+        return self.by_key.keys()
+
+    def cities(self):
+        """일정에 한 번이라도 있는 도시 이름 집합."""
+        # 커밋 알림이 인덱스를 제자리에서 고치므로 schedule()처럼 잠금 안에서 읽습니다.
+        with _index_lock:
+            return {city for city, _date_str in self.by_key}
+
+
+_schedule_index = None
+_index_lock = threading.Lock()
+
+
+def _refresh_index(version):
+    """인덱스를 version까지 맞춥니다. _index_lock 안에서 호출합니다."""
+    global _schedule_index
+    # 인덱스가 압축된 저널보다 오래되었으면 변경분을 알 수 없으므로 다시 만듭니다.
+    if _schedule_index is None or _schedule_index.version < storage.journal_floor():
+        _schedule_index = ScheduleIndex(
+            version, parse(ScheduleEntry, storage.load_cached(SCHEDULE_COLLECTION))
+        )
+    elif _schedule_index.version < version:
+        _schedule_index.apply(
+            storage.journal_since(SCHEDULE_COLLECTION, _schedule_index.version), version,
+            lambda record_id: storage.get(SCHEDULE_COLLECTION, record_id),
+        )
+    return _schedule_index
+
+
+def schedule_index(version):
+    """version 이상으로 갱신된 일정 인덱스 (프로세스 공유)."""
+    index = _schedule_index
+    if index is not None and index.version >= version:
+        return index
+    with _index_lock:
+        return _refresh_index(version)
+
+
+@lru_cache(maxsize=4)
+def schedule(version):
+    """투어 일정 전체를 날짜순 ScheduleEntry 튜플로 반환합니다. 일정 버전마다 한 번만 정렬합니다."""
+    index = schedule_index(version)
+    with _index_lock:
+        entries = list(index.by_id.values())
+    return tuple(sorted(entries, key=lambda e: e.date_str or '9999-12-31'))
+
+
+def _on_commit(collection, version):
+    """일정이 저장되면 (이미 만든) 인덱스에 변경분을 바로 반영합니다."""
+    if collection != SCHEDULE_COLLECTION or _schedule_index is None:
+        return
+    with _index_lock:
+        _refresh_index(storage.versions().get(SCHEDULE_COLLECTION, 0))
+
+
+storage.add_listener(_on_commit, remote=True)
@@ -0,0 +1,231 @@
+# route.py
+"""투어 경로 제안: 아직 일정이 없는 도시들의 방문 순서와 날짜를 총 이동 거리가 짧아지도록 정합니다.
+
+- 날짜가 정해진 일정(고정 정류지)은 그대로 두고, 그 사이 빈 날짜에만 도시를 끼워 넣습니다.
+- 초기 경로: 고정 정류지 사이 구간은 최소 비용 삽입, 마지막 고정 정류지 이후(열린 구간)는 최근접 이웃.
+- 개선: 구간마다 2-opt와 Or-opt(1~3개 도시 이동)를 더 이상 줄지 않을 때까지 반복합니다.
+거리는 geo.city_matrix의 haversine 행렬, 시간은 geo.travel_hours(60/80 km/h)를 사용합니다.
+"""
+from datetime import timedelta
+
+import geo
+
+# 하루에 한 도시를 방문한다고 가정합니다.
+DAYS_PER_STOP = 1
+
+
+class PlannedStop:
+    __slots__ = ("city", "date", "fixed")
+
+    def __init__(self, city, date, fixed):
+        self.city = city
+        self.date = date
+        self.fixed = fixed
+
+
+class RoutePlan:
+    def __init__(self, stops, leg_km):
+        self.stops = stops
+        self.leg_km = leg_km
+        self.total_km = float(sum(leg_km))
+        self.total_hours = float(sum(geo.travel_hours(leg_km))) if len(leg_km) else 0.0
+        # 빈 날짜가 모자라 넣지 못한 도시
+        self.unplaced = []
+        # 이미 일정에 있어 후보에서 뺀 도시
+        self.scheduled = []
+
+
+class _Gap:
+    """고정 정류지 사이의 빈 구간 (left/right는 노드 번호 또는 None)."""
+
+    def __init__(self, left, right, first_date, capacity):
+        self.left = left
+        self.right = right
+        self.first_date = first_date
+        self.capacity = capacity  # None이면 제한 없음 (마지막 구간)
+        self.inner = []
+
+    def full(self):
+        return self.capacity is not None and len(self.inner) >= self.capacity
+
+
+def _dist(d, a, b):
+    if a is None or b is None:
+        return 0.0
+    return d[a][b]
+
+
+def _path_cost(d, left, inner, right):
+    nodes = [left] + inner + [right]
+    return sum(_dist(d, nodes[i], nodes[i + 1]) for i in range(len(nodes) - 1))
+
+
+def _nearest_neighbour(d, start, nodes):
+    """start에서 출발해 가장 가까운 도시를 차례로 고른 순서."""
+    remaining = list(nodes)
+    order = []
+    current = start
+    while remaining:
+        if current is None:
+            nxt = remaining[0]
+        else:
+            nxt = min(remaining, key=lambda n: d[current][n])
+        remaining.remove(nxt)
+        order.append(nxt)
+        current = nxt
+    return order
+
+
+def _two_opt(d, left, inner, right):
+    """구간 내부 순서를 뒤집어 거리가 줄면 적용합니다 (양 끝 고정)."""
+    n = len(inner)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n - 1):
+            prev_i = inner[i - 1] if i > 0 else left
+            for j in range(i + 1, n):
+                next_j = inner[j + 1] if j + 1 < n else right
+                delta = (_dist(d, prev_i, inner[j]) + _dist(d, inner[i], next_j)
+                         - _dist(d, prev_i, inner[i]) - _dist(d, inner[j], next_j))
+                if delta < -1e-9:
+                    inner[i:j + 1] = reversed(inner[i:j + 1])
+                    improved = True
+    return inner
+
+
+def _or_opt(d, left, inner, right):
+    """1~3개 연속 도시를 다른 위치로 옮겨 거리가 줄면 적용합니다."""
+    improved = True
+    while improved:
+        improved = False
+        for length in (1, 2, 3):
+            n = len(inner)
+            for i in range(n - length + 1):
+                segment = inner[i:i + length]
+                prev_s = inner[i - 1] if i > 0 else left
+                next_s = inner[i + length] if i + length < n else right
+                removal_gain = (_dist(d, prev_s, segment[0]) + _dist(d, segment[-1], next_s)
+                                - _dist(d, prev_s, next_s))
+                rest = inner[:i] + inner[i + length:]
+                best = None
+                for k in range(len(rest) + 1):
+                    if k == i:
+                        continue
+                    a = rest[k - 1] if k > 0 else left
+                    b = rest[k] if k < len(rest) else right
+                    for seg in (segment, segment[::-1]):
+                        cost = _dist(d, a, seg[0]) + _dist(d, seg[-1], b) - _dist(d, a, b)
+                        if cost < removal_gain - 1e-9 and (best is None or cost < best[0]):
+                            best = (cost, k, seg)
+                if best is not None:
+                    _cost, k, seg = best
+                    inner[:] = rest[:k] + list(seg) + rest[k:]
+                    improved = True
+                    break
+            if improved:
+                break
+    return inner
+
+
+def _cheapest_insertion(d, gaps, nodes):
+    """각 도시를 빈 날짜가 남은 구간의 가장 싼 위치에 넣습니다. 넣지 못한 도시를 반환합니다."""
+    unplaced = []
+    # 고정 정류지에서 먼 도시부터 넣어야 경로가 크게 꼬이지 않습니다.
+    anchors = [g.left for g in gaps if g.left is not None] + [g.right for g in gaps if g.right is not None]
+    if anchors:
+        nodes = sorted(nodes, key=lambda n: -min(d[n][a] for a in anchors))
+    for node in nodes:
+        best = None
+        for gap in gaps:
+            if gap.full():
+                continue
+            for k in range(len(gap.inner) + 1):
+                a = gap.inner[k - 1] if k > 0 else gap.left
+                b = gap.inner[k] if k < len(gap.inner) else gap.right
+                cost = _dist(d, a, node) + _dist(d, node, b) - _dist(d, a, b)
+                if best is None or cost < best[0]:
+                    best = (cost, gap, k)
+        if best is None:
+            unplaced.append(node)
+        else:
+            _cost, gap, k = best
+            gap.inner.insert(k, node)
+    return unplaced
+
+
+def plan_route(candidates, fixed_stops, start_date, city_dict, start_city=None, scheduled_cities=()):
+    """경로를 제안합니다.
+
+    candidates: 일정에 넣을 도시 이름 목록, fixed_stops: 이미 날짜가 정해진 (도시, date) 목록,
+    start_date: 빈 날짜를 채우기 시작할 날짜, start_city: 출발 도시 (선택),
+    scheduled_cities: 날짜와 관계없이 이미 일정에 있는 도시 (후보에서 뺍니다).
+    """
+    matrix = geo.city_matrix(city_dict)
+    # 고정 정류지나 기존 일정에 이미 있는 도시는 다시 제안하지 않습니다.
+    taken = {c for c, _dt in fixed_stops} | set(scheduled_cities)
+    candidates = list(dict.fromkeys(candidates))
+    scheduled = [c for c in candidates if c in taken]
+    candidates = [c for c in candidates if c not in taken and c in matrix.index]
+    fixed = sorted(
+        [(c, dt) for c, dt in fixed_stops if c in matrix.index and dt >= start_date],
+        key=lambda x: x[1],
+    )
+
+    # 노드 번호: 0..len(names)-1 (같은 도시가 여러 번 나와도 각각 별도 노드)
+    names = candidates + [c for c, _dt in fixed] + ([start_city] if start_city in matrix.index else [])
+    km = matrix.submatrix(names)
+    d = km.tolist()
+    free_nodes = list(range(len(candidates)))
+    anchor_nodes = list(range(len(candidates), len(candidates) + len(fixed)))
+    start_node = len(names) - 1 if start_city in matrix.index else None
+
+    # 빈 구간 나누기: 시작 ~ 첫 고정, 고정 ~ 고정, 마지막 고정 ~ (끝 없음)
+    gaps = []
+    left, left_date = start_node, start_date - timedelta(days=DAYS_PER_STOP)
+    for node, (_city, fixed_date) in zip(anchor_nodes, fixed):
+        capacity = max(((fixed_date - left_date).days - 1) // DAYS_PER_STOP, 0)
+        gaps.append(_Gap(left, node, left_date + timedelta(days=DAYS_PER_STOP), capacity))
+        left, left_date = node, fixed_date
+    tail = _Gap(left, None, left_date + timedelta(days=DAYS_PER_STOP), None)
+    gaps.append(tail)
+
+    if len(gaps) == 1:
+        # 고정 정류지가 없으면 최근접 이웃으로 시작
+        tail.inner = _nearest_neighbour(d, start_node, free_nodes)
+        unplaced = []
+    else:
+        unplaced = _cheapest_insertion(d, gaps, free_nodes)
+        if tail.inner:
+            tail.inner = _nearest_neighbour(d, tail.left, tail.inner)
+
+    for gap in gaps:
+        if len(gap.inner) > 1:
+            _two_opt(d, gap.left, gap.inner, gap.right)
+            _or_opt(d, gap.left, gap.inner, gap.right)
+
+    # 날짜 배정 및 결과 조립
+    stops = []
+    order = []
+    if start_node is not None:
+        order.append(start_node)
+    for i, gap in enumerate(gaps):
+        for n, node in enumerate(gap.inner):
+            stops.append(PlannedStop(names[node], gap.first_date + timedelta(days=n * DAYS_PER_STOP), False))
+            order.append(node)
+        if gap.right is not None:
+            stops.append(PlannedStop(names[gap.right], fixed[i][1], True))
+            order.append(gap.right)
+
+    leg_km = [d[order[i]][order[i + 1]] for i in range(len(order) - 1)]
+    plan = RoutePlan(stops, leg_km)
+    plan.unplaced = [names[n] for n in unplaced]
+    plan.scheduled = scheduled
+    return plan
+
+
+def route_length(cities, city_dict):
+    """주어진 순서대로 방문할 때의 총 거리(km)."""
+    matrix = geo.city_matrix(city_dict)
+    cities = [c for c in cities if c in matrix.index]
+    return sum(matrix.distance(cities[i], cities[i + 1]) for i in range(len(cities) - 1))
@@ -0,0 +1,248 @@
+# segments.py
+"""투어 일정의 구간 표: 날짜순 정류지, 구간별 거리/시간, 누적 거리, 과거/미래 경계.
+
+일정이 저장될 때마다 저널의 변경분만 반영해 갱신하고 DB(derived 테이블)에 함께 저장합니다.
+지도는 매번 날짜를 파싱하거나 구간을 다시 계산하지 않고 이 표를 읽기만 합니다.
+이동 시간 모델(travel.py)마다 표가 따로 있습니다 (cache_key 기준).
+"""
+import threading
+from bisect import bisect_left
+from datetime import date
+
+import geo
+import storage
+
+COLLECTION = "schedule"
+
+# 모델 cache_key -> SegmentTable (프로세스 공유)
+_tables = {}
+# 이 프로세스에서 사용한 모델: 일정이 저장되면 각 모델의 표를 갱신합니다.
+_models = {}
+_lock = threading.Lock()
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SegmentStop:
+    __slots__ = ("id", "city", "date", "day", "lat", "lon")
+
+    def __init__(self, id, city, date, lat, lon):
+        self.id = id
+        self.city = city
+        self.date = date  # "YYYY-MM-DD" (정렬/경계 비교용)
+        self.day = _parse_date(date)  # 파싱된 날짜 (형식이 틀리면 None)
+        self.lat = lat
+        self.lon = lon
+
+    @property
+    def key(self):
+        return (self.date, self.id)
+
+
+def _stop_for(record):
+    """지도에 그릴 수 있는 일정이면 SegmentStop, 아니면 None."""
+    if not record or not record.get('date') or record.get('lat') is None or record.get('lon') is None or not record.get('id'):
+        return None
+    return SegmentStop(record['id'], record.get('city'), record['date'], record['lat'], record['lon'])
+
+
+class SegmentTable:
+    """날짜순 정류지와 연속 구간의 (km, 시간). 구간 값은 (앞 id, 뒤 id) 쌍으로 보관해 수정 시 재사용합니다."""
+
+    def __init__(self, version, stops, pair_legs=None):
+        self.version = version
+        self.stops = sorted(stops, key=lambda s: s.key)
+        self._keys = [s.key for s in self.stops]
+        self._by_id = {s.id: s for s in self.stops}
+        self._pair_legs = pair_legs or {}
+        self._derive()
+
+    def _derive(self):
+        self.dates = [s.date for s in self.stops]
+        legs = [self._pair_legs.get((a.id, b.id)) for a, b in zip(self.stops, self.stops[1:])]
+        self.leg_km = [leg[0] if leg else 0.0 for leg in legs]
+        self.leg_hours = [leg[1] if leg else 0.0 for leg in legs]
+        self.cum_km = []
+        total = 0.0
+        for km in self.leg_km:
+            total += km
+            self.cum_km.append(total)
+        self._leg_info = None
+
+    def missing_pairs(self):
+        return [
+            (i, a, b) for i, (a, b) in enumerate(zip(self.stops, self.stops[1:]))
+            if (a.id, b.id) not in self._pair_legs
+        ]
+
+    def fill_legs(self, travel_model):
+        """아직 값이 없는 구간만 travel_model로 계산합니다.
+
+        이어진 빠진 구간은 travel_model.legs 한 번으로 계산합니다 (처음 만들 때는 표 전체가 한 번).
+        """
+        missing = self.missing_pairs()
+        start = 0
+        while start < len(missing):
+            end = start + 1
+            while end < len(missing) and missing[end][0] == missing[end - 1][0] + 1:
+                end += 1
+            run = [a for _i, a, _b in missing[start:end]] + [missing[end - 1][2]]
+            leg_km, leg_hours = travel_model.legs(
+                [s.city for s in run], [s.lat for s in run], [s.lon for s in run]
+            )
+            for (_i, a, b), km, hours in zip(missing[start:end], leg_km, leg_hours):
+                self._pair_legs[(a.id, b.id)] = (float(km), float(hours))
+            start = end
+        if missing:
+            self._derive()
+        return bool(missing)
+
+    def _remove(self, record_id):
+        stop = self._by_id.pop(record_id, None)
+        if stop is None:
+            return
+        i = bisect_left(self._keys, stop.key)
+        # 제거되는 정류지에 닿는 구간 값은 버립니다 (좌표가 바뀌었을 수 있음)
+        if i > 0:
+            self._pair_legs.pop((self.stops[i - 1].id, record_id), None)
+        if i + 1 < len(self.stops):
+            self._pair_legs.pop((record_id, self.stops[i + 1].id), None)
+        del self.stops[i]
+        del self._keys[i]
+
+    def _add(self, stop):
+        i = bisect_left(self._keys, stop.key)
+        self._keys.insert(i, stop.key)
+        self.stops.insert(i, stop)
+        self._by_id[stop.id] = stop
+
+    def updated(self, changes, version, fetch):
+        """저널 변경분 [(seq, record_id, op)]을 반영한 새 표. fetch(record_id)는 현재 레코드를 돌려줍니다.
+
+        공개된 표는 다른 세션이 잠금 없이 읽으므로 바꾸지 않고, 구간 값을 이어받은 새 표를 만듭니다.
+        """
+        segment_table = self.copy()
+        segment_table._apply(changes, version, fetch)
+        return segment_table
+
+    def copy(self):
+        return SegmentTable(self.version, self.stops, dict(self._pair_legs))
+
+    def _apply(self, changes, version, fetch):
+        for record_id in dict.fromkeys(record_id for _seq, record_id, _op in changes):
+            self._remove(record_id)
+            stop = _stop_for(fetch(record_id))
+            if stop is not None:
+                self._add(stop)
+        # 이웃이 바뀌어 더 이상 쓰이지 않는 구간 값 정리
+        live = {(a.id, b.id) for a, b in zip(self.stops, self.stops[1:])}
+        self._pair_legs = {pair: leg for pair, leg in self._pair_legs.items() if pair in live}
+        self.version = version
+        self._derive()
+
+    def boundary(self, current_date):
+        """current_date 이후(당일 포함) 첫 정류지의 위치. 모두 지났으면 -1."""
+        i = bisect_left(self.dates, current_date.strftime("%Y-%m-%d"))
+        return i if i < len(self.stops) else -1
+
+    def leg_info(self, i):
+        """i번째 구간의 툴팁 문자열 (처음 요청될 때 한 번 만듭니다)."""
+        if self._leg_info is None:
+            self._leg_info = [None] * len(self.leg_km)
+        if self._leg_info[i] is None:
+            self._leg_info[i] = geo.format_leg(self.leg_km[i], self.leg_hours[i])
+        return self._leg_info[i]
+
+    def to_json(self):
+        return {
+            "stops": [[s.id, s.city, s.date, s.lat, s.lon] for s in self.stops],
+            "legs": [[a, b, km, h] for (a, b), (km, h) in self._pair_legs.items()],
+        }
+
+    @classmethod
+    def from_json(cls, version, data):
+        stops = [SegmentStop(*row) for row in data.get("stops", [])]
+        pair_legs = {(a, b): (km, h) for a, b, km, h in data.get("legs", [])}
+        return cls(version, stops, pair_legs)
+
+
+def from_entries(entries, travel_model):
+    """저장소와 무관한 일정 목록(models.ScheduleEntry)으로 만드는 일회용 표."""
+    stops = [
+        SegmentStop(e.id, e.city, e.date_str, e.lat, e.lon)
+        for e in entries if e.date_str and e.has_location
+    ]
+    segment_table = SegmentTable(0, stops)
+    segment_table.fill_legs(travel_model)
+    return segment_table
+
+
+def _build(version):
+    stops = [s for s in map(_stop_for, storage.load_cached(COLLECTION)) if s is not None]
+    return SegmentTable(version, stops)
+
+
+def _refresh(travel_model, version):
+    """travel_model의 표를 version까지 맞춥니다. _lock 안에서 호출합니다."""
+    key = travel_model.cache_key
+    name = f"segments:{key}"
+    current = _tables.get(key)
+    if current is None:
+        saved_version, data = storage.load_derived(name)
+        if data is not None and saved_version <= version:
+            current = SegmentTable.from_json(saved_version, data)
+
+    changed = False
+    # 표가 압축된 저널보다 오래되었으면 변경분을 알 수 없으므로 다시 만듭니다.
+    if current is None or current.version < storage.journal_floor():
+        current = _build(version)
+        changed = True
+    elif current.version < version:
+        current = current.updated(storage.journal_since(COLLECTION, current.version), version,
+                                  lambda record_id: storage.get(COLLECTION, record_id))
+        changed = True
+    elif current.missing_pairs():
+        # 공개된 표에 구간 값을 채우지 않도록 복사본에 채웁니다.
+        current = current.copy()
+    changed = current.fill_legs(travel_model) or changed
+
+    if changed:
+        try:
+            # 여러 워커가 같은 커밋으로 표를 갱신하므로, 이미 저장된 버전이면 다시 쓰지 않습니다.
+            if storage.derived_version(name) < current.version:
+                storage.save_derived(name, current.version, current.to_json())
+        except Exception:
+            # 저장에 실패해도 메모리의 표는 그대로 씁니다.
+            pass
+    _tables[key] = current
+    return current
+
+
+def table(travel_model):
+    """현재 일정 버전의 구간 표."""
+    version = storage.versions().get(COLLECTION, 0)
+    key = travel_model.cache_key
+    hit = _tables.get(key)
+    if hit is not None and hit.version == version:
+        return hit
+    with _lock:
+        _models[key] = travel_model
+        return _refresh(travel_model, version)
+
+
+def _on_commit(collection, version):
+    """일정이 저장되면 이 프로세스에서 쓰는 모델들의 표를 바로 갱신합니다."""
+    if collection != COLLECTION:
+        return
+    schedule_version = storage.versions().get(COLLECTION, 0)
+    with _lock:
+        for travel_model in list(_models.values()):
+            _refresh(travel_model, schedule_version)
+
+
+storage.add_listener(_on_commit, remote=True)
@@ -1,21 +1,314 @@
 # server.py
-from flask import Flask
-from flask_socketio import SocketIO, emit
+from flask import Flask, jsonify, request, send_from_directory
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import eventlet
+import hmac
+import json
+import os
+import time
 
 eventlet.monkey_patch()
 
+import media
+import models
+import segments
+import storage
+import tour_map
+import travel
+
 app = Flask(__name__)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+# 동시에 열어 둘 수 있는 연결 수. eventlet 서버는 연결마다 그린 스레드 하나를 쓰며 기본 한도는 1024입니다.
+MAX_CONNECTIONS = int(os.environ.get("CANTATA_HUB_MAX_CONNECTIONS", "20000"))
+
+# /trigger_refresh, /stats 호출용 공유 비밀 (live.HUB_SECRET과 같은 값). 비워 두면 같은 호스트의 호출만 받습니다.
+HUB_SECRET = os.environ.get("CANTATA_HUB_SECRET", "")
+
+# 첨부파일 이름은 내용 해시(blobs/xx/<sha256>)이므로 같은 URL의 내용은 바뀌지 않아 오래 캐시해도 됩니다.
+MEDIA_MAX_AGE = 30 * 24 * 3600
+
+# 브라우저 지도용 일정 GeoJSON: 일정 버전별로 한 번만 직렬화합니다.
+_geojson_cache = {}
+
+# /media로 내려줄 수 있는 파일 (UPLOAD_DIR 기준 상대 경로): 공지 버전별로 한 번만 모읍니다.
+_public_media_cache = {}
+
+# 마지막으로 알려진 데이터 버전 (storage 저널 순번)
+latest_version = 0
+
+def current_version():
+    global latest_version
+    try:
+        latest_version = max(latest_version, storage.data_version())
+    except Exception:
+        pass
+    return latest_version
+
+current_version()
+
+# --- 알림 허브 ---
+# 주제(컬렉션)별 방. 클라이언트는 접속 주소의 ?topics=schedule,notices로 고르고, 없으면 모두 구독합니다.
+TOPICS = ('notices', 'schedule', 'posts')
+# 연속 저장을 알림 한 번으로 묶습니다: 마지막 변경 뒤 COALESCE_SECONDS 동안 조용하면 보내되,
+# 변경이 계속 들어와도 묶음의 첫 변경부터 MAX_COALESCE_SECONDS 안에는 보냅니다.
+COALESCE_SECONDS = 0.5
+MAX_COALESCE_SECONDS = 2.0
+# 알림에 변경 목록(id, op)을 싣는 최대 건수. 넘으면 버전만 보내고 클라이언트가 다시 읽습니다.
+MAX_DELTA_CHANGES = 100
+# 클라이언트별 미전송 패킷 한도. 넘은 느린 클라이언트는 건너뛰었다가 큐가 비면 resync 알림 한 번으로 따라잡게 합니다.
+MAX_CLIENT_QUEUE = 16
+
+def _initial_versions():
+    try:
+        versions = storage.versions()
+    except Exception:
+        return {}
+    return {topic: versions.get(topic, 0) for topic in TOPICS}
+
+# 주제 -> 마지막으로 알린 버전 (변경 목록의 시작점)
+_emitted = _initial_versions()
+# 알림을 기다리는 주제 -> 버전 (None은 주제를 모르는 알림)
+_pending = {}
+_flush_scheduled = False
+_last_trigger = 0.0
+# 마지막 알림 한 번을 모든 방에 보내는 데 걸린 시간 (ms, /stats)
+_last_fanout_ms = 0.0
+# 느려서 건너뛴 클라이언트 sid -> 놓친 주제 집합
+_lagging = {}
+_catch_up_started = False
+
+def _parse_topics(value):
+    if not value:
+        return list(TOPICS)
+    if isinstance(value, str):
+        value = value.split(',')
+    return [topic for topic in value if topic in TOPICS]
+
+def _queue_size(eio_sid):
+    sock = socketio.server.eio.sockets.get(eio_sid)
+    return sock.queue.qsize() if sock is not None else 0
+
+def _delta(topic, version):
+    """topic의 알림 내용: 마지막 알림 이후 변경된 레코드 [{id, op}] (op가 delete면 삭제 표시)."""
+    payload = {'version': version, 'topic': topic}
+    since = _emitted.get(topic)
+    try:
+        # 저널이 압축되어 since 이후 기록이 일부 없으면 버전만 보냅니다.
+        if since is not None and since >= storage.journal_floor():
+            changes = storage.journal_since(topic, since)
+        else:
+            changes = None
+    except Exception:
+        changes = None
+    if changes:
+        version = max(version, changes[-1][0])
+        payload['version'] = version
+    if changes is not None and len(changes) <= MAX_DELTA_CHANGES:
+        # 같은 레코드의 여러 변경은 마지막 것만 보냅니다.
+        latest = {}
+        for _seq, record_id, op in changes:
+            latest.pop(record_id, None)
+            latest[record_id] = op
+        payload['since'] = since
+        payload['changes'] = [{'id': record_id, 'op': op} for record_id, op in latest.items()]
+    _emitted[topic] = max(version, since or 0)
+    return payload
+
+def _emit_topic(topic, version):
+    global _catch_up_started
+    payload = _delta(topic, version)
+    slow = []
+    for sid, eio_sid in socketio.server.manager.get_participants('/', topic):
+        if _queue_size(eio_sid) > MAX_CLIENT_QUEUE:
+            slow.append(sid)
+            _lagging.setdefault(sid, set()).add(topic)
+    socketio.emit('refresh', payload, to=topic, skip_sid=slow or None)
+    if slow and not _catch_up_started:
+        _catch_up_started = True
+        socketio.start_background_task(_catch_up_lagging)
+
+def _flush():
+    global _flush_scheduled, _last_fanout_ms
+    first = time.monotonic()
+    while True:
+        socketio.sleep(COALESCE_SECONDS)
+        now = time.monotonic()
+        if now - _last_trigger >= COALESCE_SECONDS or now - first >= MAX_COALESCE_SECONDS:
+            break
+    _flush_scheduled = False
+    started = time.monotonic()
+    pending = dict(_pending)
+    _pending.clear()
+    if None in pending:
+        version = pending.pop(None)
+        for topic in TOPICS:
+            pending[topic] = max(pending.get(topic, 0), version)
+    for topic, version in pending.items():
+        _emit_topic(topic, version)
+    _last_fanout_ms = (time.monotonic() - started) * 1000
+
+def _catch_up_lagging():
+    """건너뛴 클라이언트의 큐가 비면 놓친 주제를 resync 알림 한 번으로 보냅니다."""
+    while True:
+        socketio.sleep(1)
+        for sid, topics in list(_lagging.items()):
+            eio_sid = socketio.server.manager.eio_sid_from_sid(sid, '/')
+            if eio_sid is None:
+                _lagging.pop(sid, None)
+            elif _queue_size(eio_sid) <= MAX_CLIENT_QUEUE // 2:
+                _lagging.pop(sid, None)
+                for topic in topics:
+                    socketio.emit('refresh', {'version': latest_version, 'topic': topic, 'resync': True}, to=sid)
+
 @socketio.on('connect')
 def handle_connect():
-    print("Client connected")
+    for topic in _parse_topics(request.args.get('topics')):
+        join_room(topic)
+    # 접속 직후 현재 버전을 보내 끊겨 있던 동안의 변경도 반영되게 합니다.
+    # (연결마다 DB를 읽지 않도록 알림으로 갱신되는 값을 씁니다)
+    emit('refresh', {'version': latest_version})
+
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """구독 주제를 바꿉니다. data: {'topics': [...]}"""
+    topics = _parse_topics((data or {}).get('topics'))
+    for topic in TOPICS:
+        if topic in topics:
+            join_room(topic)
+        else:
+            leave_room(topic)
+    return {'topics': topics, 'version': latest_version}
+
+@socketio.on('disconnect')
+def handle_disconnect(reason=None):
+    _lagging.pop(request.sid, None)
+
+def _trusted_caller():
+    """앱 서버(live.publish)의 호출인지: 공유 비밀이 있으면 비밀로, 없으면 로컬 주소로 확인합니다."""
+    if HUB_SECRET:
+        return hmac.compare_digest(request.headers.get('X-Cantata-Secret', ''), HUB_SECRET)
+    return request.remote_addr in ('127.0.0.1', '::1')
 
 @app.route('/trigger_refresh', methods=['POST'])
 def trigger_refresh():
-    socketio.emit('refresh')
+    global _flush_scheduled, _last_trigger
+    if not _trusted_caller():
+        return "Forbidden", 403
+    payload = request.get_json(silent=True) or {}
+    # 버전은 보내는 쪽 값을 믿지 않고 저장소에서 읽습니다.
+    current_version()
+    topic = payload.get('topic')
+    topic = topic if topic in TOPICS else None
+    _pending[topic] = max(_pending.get(topic, 0), latest_version)
+    _last_trigger = time.monotonic()
+    # 묶음의 첫 변경이면 잠시 뒤 보낼 작업을 예약합니다.
+    if not _flush_scheduled:
+        _flush_scheduled = True
+        socketio.start_background_task(_flush)
     return "OK", 200
 
+@app.route('/stats')
+def stats():
+    """연결/구독 현황 (부하 테스트와 모니터링용)."""
+    if not _trusted_caller():
+        return "Forbidden", 403
+    rooms = {topic: sum(1 for _ in socketio.server.manager.get_participants('/', topic)) for topic in TOPICS}
+    return jsonify({
+        'clients': len(socketio.server.eio.sockets),
+        'rooms': rooms,
+        'lagging': len(_lagging),
+        'pending': len(_pending),
+        'last_fanout_ms': round(_last_fanout_ms, 1),
+        'version': latest_version,
+    })
+
+@app.route('/version')
+def version():
+    response = jsonify({'version': current_version()})
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+# 일정 GeoJSON (static/map.html이 사용). 일정 버전이 ETag이므로 바뀌지 않았으면 304로 응답합니다.
+@app.route('/api/schedule.geojson')
+def schedule_geojson():
+    schedule_version = storage.versions().get('schedule', 0)
+    body = _geojson_cache.get(schedule_version)
+    if body is None:
+        # 도로 그래프 모델은 앱의 도시 표가 필요하므로 여기서는 직선 거리 모델을 씁니다.
+        collection = tour_map.schedule_geojson(
+            models.schedule(schedule_version), segments.table(travel.HaversineModel())
+        )
+        body = json.dumps(collection, ensure_ascii=False, separators=(',', ':'))
+        _geojson_cache.clear()
+        _geojson_cache[schedule_version] = body
+    response = app.response_class(body, mimetype='application/geo+json')
+    response.set_etag(f'schedule-{schedule_version}')
+    # 매번 재검증하되 변경이 없으면 본문 없이 304
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response.make_conditional(request)
+
+# 변경 피드: since 이후 바뀐 레코드만 돌려줍니다 (삭제는 삭제 표시). static/map.html이 사용합니다.
+# 예: /api/changes?since=120&topics=schedule
+# 누구나 부를 수 있으므로 공개 일정만 내보냅니다 (게시글 첨부는 관리자 전용이고 레코드에 서버 경로가 들어 있음).
+FEED_TOPICS = ('schedule',)
+
+@app.route('/api/changes')
+def changes():
+    since = request.args.get('since', default=0, type=int)
+    limit = min(max(request.args.get('limit', default=storage.CHANGES_PAGE, type=int), 1), 1000)
+    topics = [topic for topic in request.args.get('topics', '').split(',') if topic in FEED_TOPICS]
+    response = jsonify(storage.changes_since(since, topics or list(FEED_TOPICS), limit))
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+# 서비스 워커는 사이트 루트 범위를 갖도록 루트 경로에서 제공합니다.
+@app.route('/sw.js')
+def service_worker():
+    response = send_from_directory(os.path.dirname(os.path.abspath(__file__)), 'sw.js', max_age=0)
+    response.headers['Service-Worker-Allowed'] = '/'
+    return response
+
+def _public_media():
+    """공지에 첨부된 파일(원본/축소본/미리보기)의 상대 경로 집합.
+
+    포스트 첨부는 관리자 전용이므로 포함하지 않습니다 (앱이 Streamlit으로 직접 보여 줍니다).
+    """
+    notices_version = storage.versions().get('notices', 0)
+    paths = _public_media_cache.get(notices_version)
+    if paths is None:
+        paths = {
+            media.media_path(path)
+            for notice in storage.load_cached('notices')
+            for file_info in notice.get('files') or []
+            for path in media.file_paths(file_info)
+        }
+        _public_media_cache.clear()
+        _public_media_cache[notices_version] = paths
+    return paths
+
+# 업로드 파일 전송: Range 요청(동영상 탐색), ETag/Last-Modified 조건부 응답을 지원하고
+# 파일을 메모리에 올리지 않고 wsgi.file_wrapper로 스트리밍합니다.
+# 공지 첨부만 내려주고, 포스트 첨부·업로드 중 임시 파일(.upload-*) 등 그 밖의 파일은 404로 응답합니다.
+@app.route('/media/<path:filename>')
+def serve_media(filename):
+    if any(part.startswith('.') for part in filename.split('/')) or filename not in _public_media():
+        return "Not Found", 404
+    download_name = request.args.get('download')
+    # 없는 파일이나 디렉터리 밖을 가리키는 경로는 send_from_directory가 404로 응답합니다.
+    response = send_from_directory(
+        os.path.abspath(media.UPLOAD_DIR),
+        filename,
+        conditional=True,
+        etag=True,
+        max_age=MEDIA_MAX_AGE,
+        as_attachment=bool(download_name),
+        download_name=download_name or None,
+    )
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
 if __name__ == '__main__':
-    socketio.run(app, host='0.0.0.0', port=5000)
+    socketio.run(app, host='0.0.0.0', port=5000, max_size=MAX_CONNECTIONS)
@@ -0,0 +1,515 @@
+# storage.py
+"""공지사항/투어 일정/사용자 포스트 레코드를 SQLite(WAL)에 저장하는 저장소 엔진."""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+
+# --- 저장 위치 ---
+DATA_DIR = os.environ.get("CANTATA_DATA_DIR", ".")
+DB_FILE = os.path.join(DATA_DIR, "cantata.db")
+
+# 기존 JSON 파일 이름 -> 컬렉션 이름 (최초 실행 시 JSON 내용을 한 번 가져옵니다)
+COLLECTIONS = {
+    "notice.json": "notices",
+    "cities.json": "schedule",
+    "user_posts.json": "posts",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    date TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+);
+-- 날짜 역순 페이지 조회용 (date, id) 커서 인덱스
+CREATE INDEX IF NOT EXISTS idx_records_date_id ON records (collection, date, id);
+
+-- 추가 전용 변경 기록 (insert/update/delete 한 건당 한 줄)
+CREATE TABLE IF NOT EXISTS journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    collection TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    op TEXT NOT NULL,
+    ts TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- 컬렉션별 데이터 버전 (해당 컬렉션의 마지막 저널 순번)
+CREATE TABLE IF NOT EXISTS versions (
+    collection TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+
+-- 첨부파일 저장소(해시 주소)의 참조 수
+CREATE TABLE IF NOT EXISTS blob_refs (
+    blob TEXT PRIMARY KEY,
+    refs INTEGER NOT NULL
+);
+
+-- 레코드에서 계산해 둔 파생 데이터 (예: 일정의 구간 표). version은 계산 당시 컬렉션 버전
+CREATE TABLE IF NOT EXISTS derived (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+# 프로세스 전체가 공유하는 읽기 캐시: collection -> (컬렉션 버전, 레코드 튜플)
+_cache = {}
+_cache_lock = threading.Lock()
+
+# 저널은 최근 JOURNAL_KEEP건만 남기고, 그만큼 더 쌓이면(COMPACT_EVERY) 오래된 기록을 지웁니다.
+JOURNAL_KEEP = 10000
+COMPACT_EVERY = 1000
+# 변경 피드 한 번에 돌려주는 최대 저널 건수
+CHANGES_PAGE = 500
+
+# 커밋 후 호출되는 변경 알림 콜백: fn(collection, version)
+_listeners = []
+# 그중 다른 프로세스의 커밋(bus.py)에도 호출되는 콜백 (캐시/인덱스 갱신용)
+_remote_listeners = []
+
+
+def collection_for(path):
+    """JSON 파일 경로를 컬렉션 이름으로 변환합니다."""
+    name = os.path.basename(path)
+    return COLLECTIONS.get(name, os.path.splitext(name)[0])
+
+
+def _connect():
+    conn = sqlite3.connect(DB_FILE, timeout=10, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=10000")
+    return conn
+
+
+def _conn():
+    """스레드별 연결을 반환합니다. (Streamlit 세션은 각자 스레드에서 실행됩니다)"""
+    global _initialized
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        conn = _connect()
+        _local.conn = conn
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.executescript(_SCHEMA)
+                for file_name, collection in COLLECTIONS.items():
+                    _import_legacy_json(conn, collection, os.path.join(DATA_DIR, file_name))
+                _initialized = True
+    return conn
+
+
+@contextmanager
+def _transaction():
+    """쓰기 잠금을 즉시 잡는 원자적 트랜잭션."""
+    conn = _conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _import_legacy_json(conn, collection, json_path):
+    """기존 JSON 파일의 데이터를 컬렉션으로 한 번만 옮깁니다."""
+    key = f"imported:{collection}"
+    if conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+        return
+
+    records = []
+    if os.path.exists(json_path):
+        try:
+            with open(json_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if isinstance(data, list):
+                records = [r for r in data if isinstance(r, dict)]
+        except (OSError, json.JSONDecodeError):
+            records = []
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # 다른 프로세스가 먼저 가져왔다면 건너뜁니다.
+        if not conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+            for record in records:
+                _insert(conn, collection, record)
+            conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, json_path))
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _encode(record):
+    return json.dumps(record, ensure_ascii=False)
+
+
+def _journal(conn, collection, record_id, op):
+    cur = conn.execute(
+        "INSERT INTO journal (collection, record_id, op) VALUES (?, ?, ?)",
+        (collection, record_id, op),
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO versions (collection, version) VALUES (?, ?)",
+        (collection, cur.lastrowid),
+    )
+
+
+def _insert(conn, collection, record):
+    record = dict(record)
+    if not record.get("id"):
+        record["id"] = str(uuid.uuid4())
+    conn.execute(
+        "INSERT OR REPLACE INTO records (collection, id, date, body) VALUES (?, ?, ?, ?)",
+        (collection, record["id"], record.get("date") or "", _encode(record)),
+    )
+    _journal(conn, collection, record["id"], "insert")
+    return record
+
+
+def _update(conn, collection, record):
+    conn.execute(
+        "UPDATE records SET date = ?, body = ? WHERE collection = ? AND id = ?",
+        (record.get("date") or "", _encode(record), collection, record["id"]),
+    )
+    _journal(conn, collection, record["id"], "update")
+
+
+def _delete(conn, collection, record_id):
+    cur = conn.execute("DELETE FROM records WHERE collection = ? AND id = ?", (collection, record_id))
+    if cur.rowcount:
+        _journal(conn, collection, record_id, "delete")
+    return cur.rowcount > 0
+
+
+# --- 읽기 ---
+def load(collection):
+    """컬렉션의 모든 레코드를 등록 순서대로 반환합니다."""
+    rows = _conn().execute(
+        "SELECT body FROM records WHERE collection = ? ORDER BY rowid", (collection,)
+    ).fetchall()
+    return [json.loads(body) for (body,) in rows]
+
+
+def page(collection, cursor=None, limit=10):
+    """날짜 역순으로 한 페이지를 읽습니다. (레코드 목록, 다음 커서)를 반환하며 마지막 페이지면 커서는 None.
+
+    커서는 직전 페이지 마지막 레코드의 (date, id)로, 인덱스를 따라 바로 이어서 읽습니다.
+    """
+    if cursor is None:
+        rows = _conn().execute(
+            "SELECT body, date, id FROM records WHERE collection = ? "
+            "ORDER BY date DESC, id DESC LIMIT ?",
+            (collection, limit + 1),
+        ).fetchall()
+    else:
+        rows = _conn().execute(
+            "SELECT body, date, id FROM records WHERE collection = ? AND (date, id) < (?, ?) "
+            "ORDER BY date DESC, id DESC LIMIT ?",
+            (collection, cursor[0], cursor[1], limit + 1),
+        ).fetchall()
+    next_cursor = (rows[limit - 1][1], rows[limit - 1][2]) if len(rows) > limit else None
+    return [json.loads(body) for body, _date, _id in rows[:limit]], next_cursor
+
+
+def get(collection, record_id):
+    row = _conn().execute(
+        "SELECT body FROM records WHERE collection = ? AND id = ?", (collection, record_id)
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def data_version():
+    """전체 데이터 버전 (저널의 마지막 순번). 변경될 때마다 단조 증가합니다."""
+    row = _conn().execute("SELECT MAX(seq) FROM journal").fetchone()
+    return row[0] or 0
+
+
+def journal_since(collection, seq):
+    """seq 이후 collection의 변경 기록 [(seq, record_id, op)]을 순서대로 반환합니다."""
+    return _conn().execute(
+        "SELECT seq, record_id, op FROM journal WHERE collection = ? AND seq > ? ORDER BY seq",
+        (collection, seq),
+    ).fetchall()
+
+
+def journal_floor():
+    """지워진 저널의 마지막 순번 (없으면 0). 이보다 작은 순번부터의 변경 기록은 불완전합니다."""
+    row = _conn().execute("SELECT value FROM meta WHERE key = 'journal_floor'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def compact_journal(keep=None):
+    """최근 keep건(기본 JOURNAL_KEEP)만 남기고 오래된 저널을 지웁니다. 지운 건수를 반환합니다.
+
+    순번은 AUTOINCREMENT라 지운 뒤에도 재사용되지 않고, 컬렉션 버전은 versions 테이블에 따로 있습니다.
+    """
+    keep = max(int(JOURNAL_KEEP if keep is None else keep), 1)
+    with _transaction() as conn:
+        last = conn.execute("SELECT MAX(seq) FROM journal").fetchone()[0] or 0
+        floor = last - keep
+        row = conn.execute("SELECT value FROM meta WHERE key = 'journal_floor'").fetchone()
+        if floor <= (int(row[0]) if row else 0):
+            return 0
+        deleted = conn.execute("DELETE FROM journal WHERE seq <= ?", (floor,)).rowcount
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('journal_floor', ?)", (str(floor),))
+    return deleted
+
+
+def changes_since(seq, collections=None, limit=CHANGES_PAGE):
+    """seq 이후의 변경 피드. 같은 레코드는 현재 상태로 한 번만 담습니다.
+
+    반환: {"seq": 다음 요청에 쓸 순번, "reset": bool, "more": bool, "changes": [...]}
+    changes 항목은 {"seq", "collection", "id", "op", "record"}이고 op는 insert/update/delete입니다.
+    delete(삭제 표시)에는 record가 없습니다. reset이 True면 seq가 저널 보관 범위보다 오래되어
+    변경 목록을 만들 수 없으므로 전체를 다시 읽어야 합니다.
+    """
+    conn = _conn()
+    where, params = "seq > ?", [seq]
+    if collections:
+        collections = list(collections)
+        where += f" AND collection IN ({', '.join('?' * len(collections))})"
+        params += collections
+    # 저널과 레코드를 같은 스냅숏에서 읽습니다 (그 사이의 압축/쓰기와 섞이지 않도록).
+    conn.execute("BEGIN")
+    try:
+        if seq < journal_floor():
+            return {"seq": data_version(), "reset": True, "more": False, "changes": []}
+        rows = conn.execute(
+            f"SELECT seq, collection, record_id, op FROM journal WHERE {where} ORDER BY seq LIMIT ?",
+            params + [limit],
+        ).fetchall()
+        more = len(rows) == limit
+        next_seq = rows[-1][0] if more else max(seq, data_version())
+
+        # (컬렉션, id) -> [처음 op, 마지막 순번]
+        latest = {}
+        for row_seq, collection, record_id, op in rows:
+            entry = latest.pop((collection, record_id), None)
+            latest[(collection, record_id)] = [entry[0] if entry else op, row_seq]
+        changes = []
+        for (collection, record_id), (first_op, row_seq) in latest.items():
+            record = conn.execute(
+                "SELECT body FROM records WHERE collection = ? AND id = ?", (collection, record_id)
+            ).fetchone()
+            change = {"seq": row_seq, "collection": collection, "id": record_id}
+            if record is None:
+                change["op"] = "delete"
+            else:
+                change["op"] = "insert" if first_op == "insert" else "update"
+                change["record"] = json.loads(record[0])
+            changes.append(change)
+    finally:
+        conn.execute("COMMIT")
+    return {"seq": next_seq, "reset": False, "more": more, "changes": changes}
+
+
+# --- 파생 데이터 ---
+def load_derived(name):
+    """저장된 파생 데이터 (version, data). 없으면 (0, None)."""
+    row = _conn().execute("SELECT version, body FROM derived WHERE name = ?", (name,)).fetchone()
+    if row is None:
+        return 0, None
+    return row[0], json.loads(row[1])
+
+
+def derived_version(name):
+    """저장된 파생 데이터의 버전. 없으면 0."""
+    row = _conn().execute("SELECT version FROM derived WHERE name = ?", (name,)).fetchone()
+    return row[0] if row is not None else 0
+
+
+def save_derived(name, version, data):
+    """파생 데이터를 저장합니다. 같거나 더 새 버전이 이미 있으면(다른 워커가 저장함) 덮어쓰지 않습니다."""
+    with _transaction() as conn:
+        cursor = conn.execute(
+            "INSERT INTO derived (name, version, body) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET version = excluded.version, body = excluded.body "
+            "WHERE excluded.version > derived.version",
+            (name, version, _encode(data)),
+        )
+    return cursor.rowcount > 0
+
+
+# --- 변경 알림 ---
+def add_listener(fn, remote=False):
+    """커밋이 끝난 뒤 fn(collection, version)을 호출하도록 등록합니다.
+
+    remote=True면 다른 워커 프로세스의 커밋 알림(external_change)에도 호출됩니다.
+    알림을 다시 내보내는 콜백(예: live.publish)은 remote로 등록하지 않습니다.
+    """
+    if fn not in _listeners:
+        _listeners.append(fn)
+    if remote and fn not in _remote_listeners:
+        _remote_listeners.append(fn)
+
+
+def _committed(collection):
+    invalidate(collection)
+    version = data_version()
+    if version - journal_floor() > JOURNAL_KEEP + COMPACT_EVERY:
+        try:
+            compact_journal()
+        except sqlite3.Error:
+            # 압축은 다음 커밋에서 다시 시도합니다.
+            pass
+    for fn in list(_listeners):
+        try:
+            fn(collection, version)
+        except Exception:
+            # 알림 실패가 저장을 되돌리지는 않습니다.
+            pass
+
+
+def external_change(collection, version):
+    """다른 프로세스가 collection을 커밋했음을 알립니다. 캐시를 비우고 remote 콜백만 호출합니다."""
+    invalidate(collection)
+    for fn in list(_remote_listeners):
+        try:
+            fn(collection, version)
+        except Exception:
+            pass
+
+
+# --- 공유 읽기 캐시 ---
+def versions():
+    """컬렉션별 데이터 버전 {collection: version}. 어느 프로세스든 커밋하면 해당 컬렉션 값이 커집니다.
+
+    versions 테이블은 컬렉션 수만큼의 행뿐이라 매번 읽어도 부담이 없고, 파일 크기/시각과 달리 정확합니다.
+    """
+    return dict(_conn().execute("SELECT collection, version FROM versions").fetchall())
+
+
+def load_cached(collection):
+    """파싱이 끝난 레코드를 모든 세션에 공유합니다. 컬렉션 버전이 바뀌었을 때만 다시 읽습니다.
+
+    반환값은 읽기 전용으로 취급해야 합니다 (수정은 insert/update/delete 사용).
+    """
+    row = _conn().execute("SELECT version FROM versions WHERE collection = ?", (collection,)).fetchone()
+    stamp = row[0] if row else 0
+    hit = _cache.get(collection)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    # 버전을 먼저 읽으므로, 읽는 도중 커밋이 일어나면 다음 호출에서 다시 읽습니다.
+    records = tuple(load(collection))
+    with _cache_lock:
+        _cache[collection] = (stamp, records)
+    return records
+
+
+def invalidate(collection=None):
+    with _cache_lock:
+        if collection is None:
+            _cache.clear()
+        else:
+            _cache.pop(collection, None)
+
+
+# --- 레코드 단위 쓰기 ---
+def insert(collection, record):
+    """레코드 한 건을 추가하고 (id가 채워진) 저장된 레코드를 반환합니다."""
+    with _transaction() as conn:
+        record = _insert(conn, collection, record)
+    _committed(collection)
+    return record
+
+
+def update(collection, record_id, fields):
+    """레코드 한 건의 일부 필드만 갱신합니다. 레코드가 없으면 None을 반환합니다.
+
+    읽기-수정-쓰기를 한 트랜잭션 안에서 수행하므로 동시에 다른 필드를 수정해도 서로 덮어쓰지 않습니다.
+    """
+    with _transaction() as conn:
+        row = conn.execute(
+            "SELECT body FROM records WHERE collection = ? AND id = ?", (collection, record_id)
+        ).fetchone()
+        if row is None:
+            return None
+        record = json.loads(row[0])
+        record.update(fields)
+        record["id"] = record_id
+        _update(conn, collection, record)
+    _committed(collection)
+    return record
+
+
+def delete(collection, record_id):
+    """레코드 한 건을 삭제합니다. 삭제되었으면 True."""
+    with _transaction() as conn:
+        deleted = _delete(conn, collection, record_id)
+    if deleted:
+        _committed(collection)
+    return deleted
+
+
+def replace_all(collection, records):
+    """컬렉션 전체를 records로 맞춥니다. 바뀐 레코드만 기록하므로 비용은 변경량에 비례합니다."""
+    changed = False
+    with _transaction() as conn:
+        current = dict(conn.execute(
+            "SELECT id, body FROM records WHERE collection = ?", (collection,)
+        ).fetchall())
+        keep = set()
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+            record_id = record.get("id")
+            if record_id in current:
+                keep.add(record_id)
+                if current[record_id] != _encode(record):
+                    _update(conn, collection, record)
+                    changed = True
+            else:
+                keep.add(_insert(conn, collection, record)["id"])
+                changed = True
+        for record_id in current:
+            if record_id not in keep:
+                changed = _delete(conn, collection, record_id) or changed
+    if changed:
+        _committed(collection)
+
+
+# --- 첨부파일 참조 수 ---
+def add_blob_ref(blob, place):
+    """blob 참조를 하나 늘립니다. place()는 같은 쓰기 잠금 안에서 호출되어 파일을 제자리에 둡니다.
+
+    참조 증가와 파일 배치가 release_blob_ref의 삭제와 섞이지 않도록 한 트랜잭션에서 처리합니다.
+    """
+    with _transaction() as conn:
+        conn.execute(
+            "INSERT INTO blob_refs (blob, refs) VALUES (?, 1) "
+            "ON CONFLICT(blob) DO UPDATE SET refs = refs + 1",
+            (blob,),
+        )
+        place()
+        return conn.execute("SELECT refs FROM blob_refs WHERE blob = ?", (blob,)).fetchone()[0]
+
+
+def release_blob_ref(blob, remove):
+    """blob 참조를 하나 줄이고, 더 이상 참조가 없으면 remove()를 호출해 파일을 지웁니다."""
+    with _transaction() as conn:
+        row = conn.execute("SELECT refs FROM blob_refs WHERE blob = ?", (blob,)).fetchone()
+        refs = (row[0] if row else 1) - 1
+        if refs > 0:
+            conn.execute("UPDATE blob_refs SET refs = ? WHERE blob = ?", (refs, blob))
+        else:
+            conn.execute("DELETE FROM blob_refs WHERE blob = ?", (blob,))
+            remove()
+        return max(refs, 0)
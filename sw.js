@@ -1,11 +1,56 @@
-const CACHE = 'cantata-v1';
+const CACHE = 'cantata-v2';
 const FILES = ['/', '/manifest.json'];
+// 허브(server.py)가 제공하는 브라우저 지도와 그 라이브러리
+const MAP_FILES = [
+  '/static/map.html',
+  'https://unpkg.com/leaflet@1.9.4/dist/leaflet.css',
+  'https://unpkg.com/leaflet@1.9.4/dist/leaflet.js',
+  'https://unpkg.com/leaflet.markercluster@1.5.3/dist/MarkerCluster.css',
+  'https://unpkg.com/leaflet.markercluster@1.5.3/dist/MarkerCluster.Default.css',
+  'https://unpkg.com/leaflet.markercluster@1.5.3/dist/leaflet.markercluster.js',
+  'https://cdn.jsdelivr.net/npm/leaflet-ant-path@1.3.0/dist/leaflet-ant-path.js',
+  'https://cdn.socket.io/4.7.5/socket.io.min.js'
+];
+// 항상 네트워크로 보내는 경로 (데이터는 ETag로 재검증)
+const NETWORK_ONLY = ['/api/', '/socket.io/', '/version', '/trigger_refresh'];
 
 self.addEventListener('install', e => {
-  e.waitUntil(caches.open(CACHE).then(cache => cache.addAll(FILES)));
+  // 출처마다 제공하는 파일이 달라 하나가 없어도 설치는 계속합니다.
+  e.waitUntil(caches.open(CACHE).then(cache =>
+    Promise.all([...FILES, ...MAP_FILES].map(f => cache.add(f).catch(() => null)))
+  ));
 });
 
+self.addEventListener('activate', e => {
+  e.waitUntil(caches.keys().then(keys =>
+    Promise.all(keys.filter(k => k !== CACHE).map(k => caches.delete(k)))
+  ));
+});
+
+// 같은 출처의 페이지(지도 등)는 네트워크 우선: 받은 응답으로 캐시를 갱신하고 오프라인일 때만 캐시를 씁니다.
+// 그래서 페이지를 고쳐도 CACHE 이름을 올릴 필요가 없습니다.
+function networkFirst(request) {
+  return fetch(request).then(response => {
+    if (response.ok) {
+      const copy = response.clone();
+      caches.open(CACHE).then(cache => cache.put(request, copy));
+    }
+    return response;
+  }).catch(() => caches.match(request).then(r => r || Response.error()));
+}
+
 self.addEventListener('fetch', e => {
+  const url = new URL(e.request.url);
+  if (url.origin === self.location.origin) {
+    if (NETWORK_ONLY.some(p => url.pathname.startsWith(p))) {
+      return;
+    }
+    if (e.request.method === 'GET' && [...FILES, ...MAP_FILES].includes(url.pathname)) {
+      e.respondWith(networkFirst(e.request));
+      return;
+    }
+  }
+  // 주소에 버전이 들어 있는 CDN 라이브러리는 내용이 바뀌지 않으므로 캐시 우선
   e.respondWith(caches.match(e.request).then(r => r || fetch(e.request)));
 });
 
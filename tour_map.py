@@ -0,0 +1,346 @@
+# tour_map.py
+"""투어 경로 지도(folium) 생성 및 완성된 HTML 캐시."""
+import json
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+import segments
+
+# 지도 HTML LRU 캐시: (일정 버전, 날짜, 언어) -> HTML
+MAX_CACHED_MAPS = 16
+_html_cache = OrderedDict()
+_html_lock = threading.Lock()
+
+# 일반 사용자에게 허브의 브라우저 지도(static/map.html)를 보여줄지 여부.
+# 브라우저가 닿는 허브 주소(CANTATA_PUBLIC_HUB_URL)를 따로 지정했을 때만 켭니다 (앱 서버용 localhost 주소로는
+# 사용자 브라우저에서 지도가 비어 보이므로). 그 밖이거나 CANTATA_CLIENT_MAP=0이면 캐시된 folium 지도를 사용합니다.
+CLIENT_MAP = bool(os.environ.get("CANTATA_PUBLIC_HUB_URL")) and os.environ.get("CANTATA_CLIENT_MAP", "1") != "0"
+
+# 정류지가 이 수 이상이면 클러스터 모드 (마커 묶음 + 클릭 시 팝업 생성)
+CLUSTER_MIN_STOPS = 40
+# 이 줌 이상에서는 묶지 않고 개별 마커로 보여줍니다.
+CLUSTER_MAX_ZOOM = 11
+
+
+def build_map(schedule, current_date, _, start_coords, travel_model, segment_table=None):
+    """일정 목록(models.ScheduleEntry)으로 folium 지도를 만듭니다. (_ 는 i18n.Translator, travel_model은 travel.py의 구간 시간 모델)
+
+    정류지 순서, 과거/미래 경계, 구간 거리/시간은 segment_table(segments.py)에서 읽습니다.
+    주지 않으면 schedule로 일회용 표를 만듭니다.
+
+    정류지가 CLUSTER_MIN_STOPS 이상이면 클러스터 모드로 그립니다: 마커는 줌 단계별로 묶이고,
+    팝업 HTML은 클릭할 때 브라우저에서 만들어집니다.
+    """
+    import folium
+    from folium.plugins import AntPath, FastMarkerCluster
+
+    if segment_table is None:
+        segment_table = segments.from_entries(schedule, travel_model)
+    records = {s.id: s for s in schedule}
+    
+    m = folium.Map(location=start_coords, zoom_start=8)
+    locations = [[stop.lat, stop.lon] for stop in segment_table.stops]
+    clustered = len(locations) >= CLUSTER_MIN_STOPS
+    cluster_rows = []
+    
+    for stop in segment_table.stops:
+        item = records.get(stop.id)
+        if item is None:
+            continue
+        lat = stop.lat
+        lon = stop.lon
+        date_str = stop.date
+        
+        # 날짜 형식이 틀린 일정은 앞으로의 일정으로 취급합니다.
+        is_past = stop.day is not None and stop.day < current_date
+        
+        if clustered:
+            # 팝업/아이콘 HTML 대신 필요한 값만 넘깁니다 (_cluster_callback이 브라우저에서 조립)
+            cluster_rows.append([
+                lat, lon, item.city, date_str, item.venue or 'N/A', item.type,
+                item.probability, item.google_link, 1 if is_past else 0,
+            ])
+            continue
+        
+        icon_color = '#BB3333'
+        opacity_val = 0.25 if is_past else 1.0
+        
+        translated_type = _.schedule_types[item.type]
+        map_type_icon = '🏠' if item.type == 'indoor' else '🌳'
+        probability_val = item.probability
+        
+        city_name_display = item.city
+        red_city_name = f'<span style="color: #BB3333; font-weight: bold;">{city_name_display}</span>'
+        
+        bar_color = "red" if probability_val < 50 else "gold" if probability_val < 90 else "#66BB66"
+        
+        prob_bar_html = f"""
+        <div style="margin-top: 5px;">
+            <b>{_('probability')}:</b>
+            <div style="width: 100%; height: 10px; background-color: #333; border-radius: 5px; overflow: hidden; margin-top: 3px;">
+                <div style="width: {probability_val}%; height: 100%; background-color: {bar_color};"></div>
+            </div>
+            <span style="font-size: 12px; font-weight: bold; color: {bar_color};">{probability_val}%</span>
+        </div>
+        """
+        
+        popup_html = f"""
+        <div style="color: #FAFAFA; background-color: #1A1A1A; padding: 10px; border-radius: 8px;">
+            <b>{_('city')}:</b> {red_city_name}<br>
+            <b>{_('date')}:</b> {date_str}<br>
+            <b>{_('venue')}:</b> {item.venue or 'N/A'}<br>
+            <b>{_('type')}:</b> {map_type_icon} {translated_type}<br>
+            {prob_bar_html}
+        """
+        
+        if item.google_link:
+            google_link_url = item.google_link
+            popup_html += f'<a href="{google_link_url}" target="_blank" style="color: #FFD700; text-decoration: none; display: block; margin-top: 5px;">{_("google_link")}</a>'
+        
+        popup_html += "</div>"
+        
+        city_initial = item.city[0]
+        marker_icon_html = f"""
+            <div style="
+                transform: scale(0.666); 
+                opacity: {opacity_val};
+                text-align: center;
+                white-space: nowrap;
+            ">
+                <i class="fa fa-map-marker fa-3x" style="color: {icon_color};"></i>
+                <div style="font-size: 10px; color: black; font-weight: bold; position: absolute; top: 12px; left: 13px;">{city_initial}</div>
+            </div>
+        """
+        
+        folium.Marker(
+            [lat, lon],
+            popup=folium.Popup(popup_html, max_width=300),
+            icon=folium.DivIcon(
+                icon_size=(30, 45),
+                icon_anchor=(15, 45),
+                html=marker_icon_html
+            )
+        ).add_to(m)
+
+    if cluster_rows:
+        FastMarkerCluster(
+            cluster_rows,
+            callback=_cluster_callback(_),
+            disableClusteringAtZoom=CLUSTER_MAX_ZOOM,
+            spiderfyOnMaxZoom=False,
+        ).add_to(m)
+
+    # 4. AntPath (경로 애니메이션) - 과거/미래 분리 및 스타일 적용
+    if len(locations) > 1:
+        current_index = segment_table.boundary(current_date)
+        
+        if current_index == -1: 
+            past_segments = locations
+            future_segments = []
+        elif current_index == 0: 
+            past_segments = []
+            future_segments = locations
+        else: 
+            past_segments = locations[:current_index + 1]
+            future_segments = locations[current_index:]
+
+        # 지난 경로: 25% 투명도의 빨간색 선
+        if len(past_segments) > 1:
+            folium.PolyLine(
+                locations=past_segments,
+                color="#BB3333",
+                weight=5,
+                opacity=0.25, # 25% 투명도
+                tooltip=_("past_route")
+            ).add_to(m)
+            
+        # 미래 경로: AntPath 애니메이션 및 툴팁
+        if len(future_segments) > 1:
+            AntPath(
+                future_segments, 
+                use="regular", 
+                dash_array='30, 20', 
+                color='#BB3333', 
+                weight=5, 
+                opacity=0.8,
+                options={"delay": 24000, "dash_factor": -0.1, "color": "#BB3333"} 
+            ).add_to(m)
+
+            # 세그먼트별 툴팁 (거리/시간) - 구간 표에서 읽기만 합니다.
+            # 구간마다 PolyLine을 만들지 않고 하나의 GeoJSON 레이어로 합칩니다.
+            segment_features = [
+                {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "LineString",
+                        # GeoJSON 좌표 순서는 [lon, lat]
+                        "coordinates": [[p1[1], p1[0]], [p2[1], p2[0]]],
+                    },
+                    "properties": {"info": segment_table.leg_info(current_index + i)},
+                }
+                for i, (p1, p2) in enumerate(zip(future_segments, future_segments[1:]))
+            ]
+            folium.GeoJson(
+                {"type": "FeatureCollection", "features": segment_features},
+                name="segments",
+                style_function=lambda _feature: {"color": "transparent", "weight": 15, "opacity": 0},
+                highlight_function=None,
+                tooltip=folium.GeoJsonTooltip(
+                    fields=["info"],
+                    labels=False,
+                    sticky=True,
+                    direction="top",
+                    style="background-color: #2D2D2D; color: #FAFAFA; padding: 5px; border-radius: 5px;"
+                ),
+                control=False,
+            ).add_to(m)
+            
+        elif locations:
+            try:
+                single_item_date = segment_table.stops[0].day
+                single_is_past = single_item_date < current_date
+            except TypeError:
+                single_is_past = False
+                
+            folium.Circle(
+                location=locations[0],
+                radius=1000,
+                color='#BB3333',
+                fill=True,
+                fill_color='#BB3333',
+                fill_opacity=0.25 if single_is_past else 0.8,
+                tooltip=_("single_location")
+            ).add_to(m)
+
+    # 지도 표시
+
+    return m
+
+
+def _cluster_callback(_):
+    """FastMarkerCluster용 JS 콜백 (함수 식). 행 형식은 build_map의 cluster_rows를 따릅니다."""
+    labels = {
+        key: _(key) for key in ("city", "date", "venue", "type", "probability", "google_link", "indoor", "outdoor")
+    }
+    # <script> 안에 들어가므로 </script> 조기 종료를 막습니다.
+    labels_js = json.dumps(labels, ensure_ascii=False).replace("<", "\\u003c")
+    return """(function () {
+    var labels = %s;
+    function esc(value) {
+        return String(value).replace(/[&<>"']/g, function (c) {
+            return {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}[c];
+        });
+    }
+    function popupHtml(row) {
+        var probability = row[6];
+        var barColor = probability < 50 ? "red" : probability < 90 ? "gold" : "#66BB66";
+        var typeIcon = row[5] === "indoor" ? "🏠" : "🌳";
+        var html = '<div style="color: #FAFAFA; background-color: #1A1A1A; padding: 10px; border-radius: 8px;">'
+            + '<b>' + labels.city + ':</b> <span style="color: #BB3333; font-weight: bold;">' + esc(row[2]) + '</span><br>'
+            + '<b>' + labels.date + ':</b> ' + esc(row[3]) + '<br>'
+            + '<b>' + labels.venue + ':</b> ' + esc(row[4]) + '<br>'
+            + '<b>' + labels.type + ':</b> ' + typeIcon + ' ' + labels[row[5]] + '<br>'
+            + '<div style="margin-top: 5px;"><b>' + labels.probability + ':</b>'
+            + '<div style="width: 100%%; height: 10px; background-color: #333; border-radius: 5px; overflow: hidden; margin-top: 3px;">'
+            + '<div style="width: ' + probability + '%%; height: 100%%; background-color: ' + barColor + ';"></div></div>'
+            + '<span style="font-size: 12px; font-weight: bold; color: ' + barColor + ';">' + probability + '%%</span></div>';
+        if (row[7]) {
+            html += '<a href="' + esc(row[7]) + '" target="_blank" style="color: #FFD700; text-decoration: none; display: block; margin-top: 5px;">'
+                + labels.google_link + '</a>';
+        }
+        return html + '</div>';
+    }
+    return function (row) {
+        var icon = L.divIcon({
+            className: "empty",
+            iconSize: [30, 45],
+            iconAnchor: [15, 45],
+            html: '<div style="transform: scale(0.666); opacity: ' + (row[8] ? 0.25 : 1.0) + '; text-align: center; white-space: nowrap;">'
+                + '<i class="fa fa-map-marker fa-3x" style="color: #BB3333;"></i>'
+                + '<div style="font-size: 10px; color: black; font-weight: bold; position: absolute; top: 12px; left: 13px;">'
+                + esc(String(row[2]).charAt(0)) + '</div></div>'
+        });
+        var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+        // 팝업 내용은 처음 열 때 만듭니다.
+        marker.bindPopup(function () { return popupHtml(row); }, {maxWidth: 300});
+        return marker;
+    };
+})()""" % labels_js
+
+
+def schedule_geojson(schedule, segment_table):
+    """일정을 브라우저 지도(static/map.html)용 GeoJSON FeatureCollection으로 만듭니다.
+
+    정류지는 날짜순 Point이고, 다음 정류지까지의 거리/시간(leg_km, leg_hours)을 함께 담습니다.
+    과거/미래 구분은 보는 쪽의 날짜로 브라우저에서 합니다.
+    """
+    records = {s.id: s for s in schedule}
+    stops = segment_table.stops
+    leg_km, leg_hours = segment_table.leg_km, segment_table.leg_hours
+
+    features = []
+    for i, stop in enumerate(stops):
+        item = records.get(stop.id)
+        if item is None:
+            continue
+        properties = {
+            "id": item.id,
+            "city": item.city,
+            "date": item.date_str,
+            "venue": item.venue or 'N/A',
+            "type": item.type,
+            "probability": item.probability,
+        }
+        if item.google_link:
+            properties["google_link"] = item.google_link
+        if i < len(stops) - 1:
+            properties["leg_km"] = round(float(leg_km[i]), 1)
+            properties["leg_hours"] = round(float(leg_hours[i]), 4)
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [stop.lon, stop.lat]},
+            "properties": properties,
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def client_map_url(hub_url, current_date, start_coords, _):
+    """허브가 제공하는 브라우저 지도 주소. 날짜/중심/번역은 # 뒤에 넘겨 서버 요청에 포함되지 않습니다."""
+    labels = {
+        key: _(key) for key in (
+            "city", "date", "venue", "type", "probability", "google_link",
+            "indoor", "outdoor", "past_route", "single_location",
+        )
+    }
+    fragment = urlencode({
+        "today": current_date.strftime("%Y-%m-%d"),
+        "lat": start_coords[0],
+        "lon": start_coords[1],
+        "labels": json.dumps(labels, ensure_ascii=False),
+    })
+    return f"{hub_url}/static/map.html#{fragment}"
+
+
+def render_map_html(schedule_version, current_date, lang, build, extra_key=None):
+    """완성된 지도 HTML을 반환합니다. 같은 키로 다시 요청하면 folium 객체를 만들지 않습니다.
+
+    build는 캐시에 없을 때만 호출되어 folium.Map을 돌려주는 함수입니다.
+    extra_key는 지도 내용에 영향을 주는 그 밖의 상태 (예: 이동 시간 모델)입니다.
+    """
+    key = (schedule_version, current_date, lang, extra_key)
+    with _html_lock:
+        html = _html_cache.get(key)
+        if html is not None:
+            _html_cache.move_to_end(key)
+            return html
+
+    html = build().get_root().render()
+
+    with _html_lock:
+        _html_cache[key] = html
+        _html_cache.move_to_end(key)
+        while len(_html_cache) > MAX_CACHED_MAPS:
+            _html_cache.popitem(last=False)
+    return html
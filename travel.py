@@ -0,0 +1,166 @@
+# travel.py
+"""구간 이동 거리/시간 모델.
+
+- HaversineModel: 직선 거리 + 60/80 km/h 가정 (기본값, 항상 사용 가능)
+- RoadGraphModel: 로컬 도로 그래프(예: 마하라슈트라 OSM 추출본을 변환한 JSON)에서 Dijkstra로 구한
+  도시 간 최단 시간 경로. 그래프 읽기와 도시 표 전체의 쌍별 표 계산을 백그라운드에서 해 두고,
+  표가 준비되기 전이나 경로가 없는 쌍은 HaversineModel로 대신합니다.
+
+도로 그래프 파일 형식 (CANTATA_ROAD_GRAPH, 기본값 data/maharashtra_roads.json):
+    {"nodes": {"<id>": [lat, lon], ...},
+     "edges": [["<id>", "<id>", km, speed_kmh], ...]}   # 양방향
+"""
+import heapq
+import json
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+import geo
+
+ROAD_GRAPH_FILE = os.environ.get("CANTATA_ROAD_GRAPH", os.path.join("data", "maharashtra_roads.json"))
+
+# 도시에서 가장 가까운 도로 노드가 이보다 멀면 그 도시는 도로 그래프를 쓰지 않습니다.
+MAX_SNAP_KM = 25
+
+
+class HaversineModel:
+    """직선 거리와 거리별 평균 속도로 추정하는 기본 모델."""
+
+    cache_key = "haversine"
+
+    def leg(self, city1, p1, city2, p2):
+        distance_km = geo.haversine(p1[0], p1[1], p2[0], p2[1])
+        return distance_km, float(geo.travel_hours(distance_km))
+
+    def legs(self, cities, lats, lons):
+        """연속한 정류지 구간들의 (km 배열, 시간 배열)."""
+        leg_km = geo.leg_distances(lats, lons)
+        return leg_km, geo.travel_hours(leg_km)
+
+
+class RoadGraphModel:
+    """도로 그래프 기반 모델. 도시 쌍별 결과는 미리 계산한 표에서 읽기만 합니다.
+
+    그래프 파일 읽기, 도시-도로 노드 연결, 쌍별 표 계산은 모두 백그라운드 스레드에서 하므로
+    첫 화면은 기다리지 않고, 표가 준비되기 전에는 fallback 결과를 돌려줍니다.
+    """
+
+    def __init__(self, graph_path, city_dict, fallback):
+        self.fallback = fallback
+        self.adjacency = []
+        self.city_nodes = {}
+        self._table = {}
+        self._cache_key = "roads-pending"
+        self._ready = threading.Event()
+        threading.Thread(
+            target=self._precompute, args=(graph_path, city_dict), name="road-table", daemon=True
+        ).start()
+
+    @property
+    def cache_key(self):
+        # 표가 준비되면 지도 캐시 키가 바뀌어 도로 기준 툴팁으로 다시 그려집니다.
+        return self._cache_key
+
+    def _load(self, graph, city_dict):
+        node_ids = list(graph["nodes"])
+        node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+        coords = [graph["nodes"][node_id] for node_id in node_ids]
+
+        # 인접 리스트: node -> [(이웃, km, 시간)]
+        adjacency = [[] for _ in node_ids]
+        for a, b, km, speed_kmh in graph["edges"]:
+            if a in node_index and b in node_index and speed_kmh > 0:
+                ia, ib, hours = node_index[a], node_index[b], km / speed_kmh
+                adjacency[ia].append((ib, km, hours))
+                adjacency[ib].append((ia, km, hours))
+        self.adjacency = adjacency
+
+        # 도시를 가장 가까운 도로 노드에 연결 (연결 구간은 직선 + 저속으로 계산)
+        node_lookup = geo.CityIndex(range(len(node_ids)), [c[0] for c in coords], [c[1] for c in coords])
+        city_nodes = {}
+        for city, c in city_dict.items():
+            nearest = node_lookup.nearest(c["lat"], c["lon"], k=1)
+            if nearest and nearest[0][1] <= MAX_SNAP_KM:
+                node, snap_km = nearest[0]
+                city_nodes[city] = (node, snap_km, snap_km / geo.SHORT_TRIP_KMH)
+        self.city_nodes = city_nodes
+
+    def _dijkstra(self, source):
+        """source 노드에서 모든 노드까지의 최단 시간 경로 {node: (시간, km)}."""
+        best = {source: (0.0, 0.0)}
+        heap = [(0.0, 0.0, source)]
+        while heap:
+            hours, km, node = heapq.heappop(heap)
+            if best[node][0] < hours:
+                continue
+            for neighbour, edge_km, edge_hours in self.adjacency[node]:
+                new_hours = hours + edge_hours
+                if neighbour not in best or new_hours < best[neighbour][0]:
+                    best[neighbour] = (new_hours, km + edge_km)
+                    heapq.heappush(heap, (new_hours, km + edge_km, neighbour))
+        return best
+
+    def _precompute(self, graph_path, city_dict):
+        """그래프를 읽어 모든 도시 쌍의 (km, 시간) 표를 만듭니다. 도시마다 Dijkstra 한 번."""
+        graph = _load_graph(graph_path)
+        if graph is None:
+            # 읽을 수 없는 그래프: 직선 거리 모델과 같은 결과이므로 그 표를 함께 씁니다.
+            self._cache_key = self.fallback.cache_key
+            self._ready.set()
+            return
+        self._load(graph, city_dict)
+        table = {}
+        for city1, (node1, snap_km1, snap_h1) in self.city_nodes.items():
+            reached = self._dijkstra(node1)
+            for city2, (node2, snap_km2, snap_h2) in self.city_nodes.items():
+                if city1 != city2 and node2 in reached:
+                    hours, km = reached[node2]
+                    table[(city1, city2)] = (km + snap_km1 + snap_km2, hours + snap_h1 + snap_h2)
+        self._table = table
+        self._cache_key = "roads"
+        self._ready.set()
+
+    def leg(self, city1, p1, city2, p2):
+        hit = self._table.get((city1, city2))
+        if hit is not None:
+            return hit
+        return self.fallback.leg(city1, p1, city2, p2)
+
+    def legs(self, cities, lats, lons):
+        if not self._ready.is_set():
+            return self.fallback.legs(cities, lats, lons)
+        pairs = [
+            self.leg(cities[i], (lats[i], lons[i]), cities[i + 1], (lats[i + 1], lons[i + 1]))
+            for i in range(len(cities) - 1)
+        ]
+        return np.array([p[0] for p in pairs]), np.array([p[1] for p in pairs])
+
+
+def _load_graph(path):
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            graph = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(graph, dict) or not graph.get("nodes") or not graph.get("edges"):
+        return None
+    return graph
+
+
+@lru_cache(maxsize=2)
+def _model(key, graph_path):
+    fallback = HaversineModel()
+    if not graph_path:
+        return fallback
+    city_dict = {name: {"lat": lat, "lon": lon} for name, lat, lon in key}
+    # 그래프는 모델의 백그라운드 스레드가 읽습니다 (큰 OSM 추출본도 스크립트 실행을 막지 않도록).
+    return RoadGraphModel(graph_path, city_dict, fallback)
+
+
+def model(city_dict):
+    """현재 이동 시간 모델 (프로세스당 한 번 생성). 도로 그래프 파일이 없으면 HaversineModel."""
+    key = tuple((name, c["lat"], c["lon"]) for name, c in city_dict.items())
+    return _model(key, ROAD_GRAPH_FILE if os.path.exists(ROAD_GRAPH_FILE) else None)